@@ -1,14 +1,137 @@
 # conftest.py
+import copy
+import os
+import shutil
+import time
+
 import pytest
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connections
+from django.test import override_settings
 
 # Импортируем модель заметки, чтобы создать экземпляр.
 from notes.models import Note
+from notes.tests.factories import create_users
+
+# Пользователи создаются один раз в шаблонной базе, а не в каждом тесте.
+SEED_USERNAMES = {'author': 'Автор'}
+# Шарды, которые тесты включают через settings.NOTES_SHARDS.
+TEST_SHARDS = ('notes_shard_1', 'notes_shard_2')
+TEMPLATE_TIMEOUT = 120
+
+for alias in TEST_SHARDS:
+    if alias not in settings.DATABASES:
+        settings.DATABASES[alias] = copy.deepcopy(
+            settings.DATABASES['default']
+        )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_modifyitems(items):
+    """При нескольких шардах тестам с базой доступны все их базы."""
+    shards = list(settings.NOTES_SHARDS)
+    if len(shards) == 1:
+        return
+    for item in items:
+        marker = item.get_closest_marker('django_db')
+        args, kwargs = (marker.args, marker.kwargs) if marker else ((), {})
+        item.add_marker(
+            pytest.mark.django_db(*args, **{'databases': shards, **kwargs}),
+            append=False,
+        )
+
+
+def use_database(alias, name):
+    """Переключает соединение alias на другой файл SQLite."""
+    connections[alias].close()
+    settings.DATABASES[alias]['NAME'] = name
+
+
+def build_once(shared, build):
+    """Шаблоны собирает первый процесс, остальные ждут готового маркера.
+
+    Замок — файл, созданный с O_EXCL: так работает на любой ОС.
+    """
+    ready = shared / 'templates.ready'
+    try:
+        os.close(os.open(
+            shared / 'templates.lock', os.O_CREAT | os.O_EXCL | os.O_WRONLY
+        ))
+    except FileExistsError:
+        deadline = time.monotonic() + TEMPLATE_TIMEOUT
+        while not ready.exists():
+            if time.monotonic() > deadline:
+                raise RuntimeError('Шаблонные базы так и не были собраны.')
+            time.sleep(0.05)
+        return
+    build()
+    ready.touch()
+
+
+@pytest.fixture(scope='session')
+def django_db_setup(request, tmp_path_factory, django_db_blocker):
+    """Шаблонные базы собираются один раз, воркеры xdist получают копии.
+
+    Шаблон есть у каждого псевдонима из DATABASES, в том числе у
+    шардов заметок, поэтому тесты не трогают настоящие файлы баз.
+    Тесты, как и раньше, откатываются транзакцией. Тесты
+    с transaction=True очищают базы и не должны полагаться
+    на засеянных пользователей.
+    """
+    worker_id = getattr(
+        request.config, 'workerinput', {}
+    ).get('workerid', 'master')
+    shared = tmp_path_factory.getbasetemp()
+    if worker_id != 'master':
+        shared = shared.parent
+    aliases = list(settings.DATABASES)
+
+    def build():
+        # Схема шардов строится так же, как при включённом шардировании.
+        with override_settings(NOTES_SHARDS=aliases):
+            for alias in aliases:
+                use_database(alias, str(shared / f'template_{alias}.sqlite3'))
+                with django_db_blocker.unblock():
+                    call_command('migrate', database=alias, verbosity=0)
+                connections[alias].close()
+        with django_db_blocker.unblock():
+            create_users(*SEED_USERNAMES.values())
+        connections['default'].close()
+
+    build_once(shared, build)
+    databases = {}
+    for alias in aliases:
+        databases[alias] = shared / f'test_{worker_id}_{alias}.sqlite3'
+        shutil.copy(shared / f'template_{alias}.sqlite3', databases[alias])
+        use_database(alias, str(databases[alias]))
+    yield
+    for alias, database in databases.items():
+        connections[alias].close()
+        database.unlink()
+
+
+@pytest.fixture(autouse=True, scope='session')
+def shared_notes_cache(tmp_path_factory):
+    """Файловый кэш публичных страниц — во временном каталоге процесса."""
+    location = tmp_path_factory.mktemp('shared_notes_cache')
+    settings.CACHES['shared_notes']['LOCATION'] = str(location)
+
+
+@pytest.fixture(scope='session')
+def seeded_users(django_db_setup, django_db_blocker):
+    with django_db_blocker.unblock():
+        users = get_user_model().objects.in_bulk(
+            SEED_USERNAMES.values(), field_name='username'
+        )
+    return {key: users[name] for key, name in SEED_USERNAMES.items()}
 
 
 @pytest.fixture
-# Используем встроенную фикстуру для модели пользователей django_user_model.
-def author(django_user_model):
-    return django_user_model.objects.create(username='Автор')
+# Используем заранее созданного пользователя вместо запроса в каждом тесте.
+def author(db, seeded_users):
+    return copy.deepcopy(seeded_users['author'])
 
 
 @pytest.fixture
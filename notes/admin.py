@@ -1,5 +1,152 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.auth import get_user_model
+from django.core.paginator import Paginator
+from django.db.models import Max
+from django.shortcuts import redirect
+from django.utils.functional import cached_property
 
 from .models import Note
+from .sharding import get_shards
+from .stats import reconcile
 
-admin.site.register(Note)
+User = get_user_model()
+
+BATCH_SIZE = 1000
+SHARDED_MESSAGE = (
+    'Заметки хранятся в нескольких шардах, а админка видит только основную '
+    'базу. Список, правка и удаление заметок здесь отключены; используйте '
+    'manage.py rebalance_notes и reconcile_stats.'
+)
+
+
+class EstimatedCountPaginator(Paginator):
+    """Без фильтров оценивает число строк по максимальному pk.
+
+    Поиск максимума по первичному ключу занимает O(log n), а не полный
+    COUNT(*). Удалённые строки делают оценку завышенной.
+    """
+
+    @cached_property
+    def count(self):
+        query = self.object_list.query
+        if query.where or query.distinct:
+            return super().count
+        return self.object_list.aggregate(estimate=Max('pk'))['estimate'] or 0
+
+
+class NoteActionForm(ActionForm):
+    author = forms.IntegerField(
+        label='id нового автора',
+        required=False,
+        min_value=1,
+    )
+
+
+def batched_pks(queryset, batch_size=BATCH_SIZE):
+    """Выдаёт pk из queryset пачками, двигаясь по индексу pk."""
+    queryset = queryset.order_by('pk').values_list('pk', flat=True)
+    last_pk = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            return
+        last_pk = batch[-1]
+        yield batch
+
+
+@admin.register(Note)
+class NoteAdmin(admin.ModelAdmin):
+    list_display = ('id', 'title', 'slug', 'author')
+    list_select_related = ('author',)
+    # Только точные совпадения по индексированным полям.
+    search_fields = ('=slug', '=author__username')
+    raw_id_fields = ('author',)
+    # Сортировка по pk, новые сверху: идёт по индексу первичного ключа
+    # в обратном порядке, без сортировки всей таблицы.
+    ordering = ('-pk',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    action_form = NoteActionForm
+    actions = ('delete_in_batches', 'reassign_author')
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer('text')
+
+    def changelist_view(self, request, extra_context=None):
+        return self.unless_sharded(request) or super().changelist_view(
+            request, extra_context
+        )
+
+    def change_view(self, request, object_id, form_url='',
+                    extra_context=None):
+        return self.unless_sharded(request) or super().change_view(
+            request, object_id, form_url, extra_context
+        )
+
+    def delete_view(self, request, object_id, extra_context=None):
+        return self.unless_sharded(request) or super().delete_view(
+            request, object_id, extra_context
+        )
+
+    def unless_sharded(self, request):
+        """При нескольких шардах уводит на главную админки с пояснением.
+
+        Чтения без экземпляра маршрутизатор отправляет в основную базу,
+        поэтому список и действия видели бы лишь часть заметок.
+        """
+        if len(get_shards()) == 1:
+            return None
+        self.message_user(request, SHARDED_MESSAGE, messages.WARNING)
+        return redirect('admin:index')
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        # Стандартное действие грузит все объекты на страницу подтверждения.
+        actions.pop('delete_selected', None)
+        return actions
+
+    @admin.action(
+        description='Удалить выбранные заметки пачками',
+        permissions=('delete',),
+    )
+    def delete_in_batches(self, request, queryset):
+        deleted = 0
+        for batch in batched_pks(queryset):
+            notes = Note.objects.filter(pk__in=batch)
+            # Как и delete_selected, записываем удаление в журнал админки.
+            for note in notes.only('pk', 'title'):
+                self.log_deletion(request, note, str(note))
+            deleted += notes.delete()[1].get(Note._meta.label, 0)
+        self.message_user(request, f'Удалено заметок: {deleted}')
+
+    @admin.action(
+        description='Передать выбранные заметки другому автору',
+        permissions=('change',),
+    )
+    def reassign_author(self, request, queryset):
+        if len(get_shards()) > 1:
+            self.message_user(
+                request,
+                'Передача заметок недоступна при нескольких шардах.',
+                messages.ERROR,
+            )
+            return
+        try:
+            author_id = int(request.POST.get('author', ''))
+        except ValueError:
+            author_id = None
+        if not User.objects.filter(pk=author_id).exists():
+            self.message_user(
+                request, 'Укажите id существующего автора.', messages.ERROR
+            )
+            return
+        updated = 0
+        for batch in batched_pks(queryset):
+            notes = Note.objects.filter(pk__in=batch)
+            # update() минует сигналы, поэтому счётчики пересчитываются.
+            affected = set(notes.values_list('author_id', flat=True))
+            updated += notes.update(author_id=author_id)
+            reconcile(list(affected | {author_id}), notes.db)
+        self.message_user(request, f'Передано заметок: {updated}')
@@ -0,0 +1,72 @@
+"""Сжатие ответов gzip/brotli с учётом Accept-Encoding."""
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Порядок предпочтения: brotli плотнее gzip на HTML.
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+BROTLI_QUALITY = 5
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/json', 'application/javascript', 'image/svg+xml',
+)
+
+
+def compress(content, encoding):
+    if encoding == 'br':
+        return brotli.compress(content, quality=BROTLI_QUALITY)
+    return compress_string(content)
+
+
+def accepted_encodings(header):
+    """Кодировки из Accept-Encoding, разрешённые клиентом (q > 0)."""
+    accepted = set()
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        q_value = params.strip().partition('q=')[2]
+        try:
+            if q_value and float(q_value) <= 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+def choose_encoding(request):
+    accepted = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    for encoding in ENCODINGS:
+        if encoding in accepted or '*' in accepted:
+            return encoding
+    return None
+
+
+def compress_response(request, response, min_size):
+    """Сжимает ответ, если он достаточно велик и клиент это поддерживает."""
+    if (
+        response.streaming
+        or response.has_header('Content-Encoding')
+        or len(response.content) < min_size
+        or not response.get('Content-Type', '').startswith(
+            COMPRESSIBLE_TYPES
+        )
+    ):
+        return response
+    patch_vary_headers(response, ('Accept-Encoding',))
+    encoding = choose_encoding(request)
+    if encoding is None:
+        return response
+    content = compress(response.content, encoding)
+    if len(content) >= len(response.content):
+        return response
+    response.content = content
+    response['Content-Length'] = str(len(content))
+    response['Content-Encoding'] = encoding
+    # Тело зависит от кодировки, поэтому сильный ETag становится слабым.
+    etag = response.get('ETag')
+    if etag and etag.startswith('"'):
+        response['ETag'] = 'W/' + etag
+    return response
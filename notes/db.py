@@ -0,0 +1,67 @@
+"""Настройка соединений SQLite и повтор запросов при блокировке базы."""
+import functools
+import random
+import time
+
+from django.conf import settings
+from django.db import OperationalError, connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from .sharding import AuthorMoving
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    """Применяет SQLITE_PRAGMAS к каждому новому соединению SQLite."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def is_locked(error):
+    return isinstance(error, AuthorMoving) or 'is locked' in str(error)
+
+
+def in_transaction():
+    return any(connection.in_atomic_block for connection in connections.all())
+
+
+def lock_backoff(attempt):
+    """Экспоненциальная задержка со случайным разбросом, в секундах."""
+    delay = min(
+        settings.SQLITE_LOCK_RETRY_MAX_DELAY,
+        settings.SQLITE_LOCK_RETRY_DELAY * 2 ** attempt,
+    )
+    return random.uniform(delay / 2, delay)
+
+
+def retry_on_lock(method):
+    """Повторяет запись модели, если SQLite ответил «database is locked»
+    или заметки автора прямо сейчас переносятся между шардами.
+
+    Повтор возможен только вне внешней транзакции: внутри неё
+    откатится всё, что уже сделано, и ошибка пробрасывается дальше.
+    Базу для записи определяет сам метод при каждой попытке: за время
+    переноса автора его шард мог смениться.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        attempt = 0
+        while True:
+            try:
+                return method(self, *args, **kwargs)
+            except OperationalError as error:
+                if (
+                    not is_locked(error)
+                    or in_transaction()
+                    or attempt >= settings.SQLITE_LOCK_RETRIES
+                ):
+                    raise
+            time.sleep(lock_backoff(attempt))
+            attempt += 1
+
+    return wrapper
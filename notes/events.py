@@ -0,0 +1,92 @@
+"""Внутрипроцессная шина событий об изменениях заметок."""
+import asyncio
+import contextlib
+import contextvars
+import json
+import threading
+from collections import defaultdict
+
+QUEUE_SIZE = 100
+
+_muted = contextvars.ContextVar('note_events_muted', default=False)
+
+
+class NoteEventBroker:
+    """Раздаёт события подписчикам — очередям asyncio — по id автора.
+
+    Публиковать можно из любого потока: события передаются в цикл
+    событий подписчика через call_soon_threadsafe. Подписки меняются
+    в потоке цикла, а публикуются из потоков запросов, поэтому словарь
+    подписчиков защищён блокировкой.
+    """
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, author_id):
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        with self._lock:
+            self._subscribers[author_id].add(
+                (asyncio.get_running_loop(), queue)
+            )
+        return queue
+
+    def unsubscribe(self, author_id, queue):
+        with self._lock:
+            subscribers = self._subscribers.get(author_id, set())
+            subscribers.difference_update(
+                {item for item in subscribers if item[1] is queue}
+            )
+            if not subscribers:
+                self._subscribers.pop(author_id, None)
+
+    def publish(self, author_id, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(author_id, ()))
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(self._put, queue, event)
+
+    @staticmethod
+    def _put(queue, event):
+        # Медленный клиент теряет события, а не копит память.
+        if not queue.full():
+            queue.put_nowait(event)
+
+
+broker = NoteEventBroker()
+
+
+@contextlib.contextmanager
+def muted():
+    """Изменения заметок внутри блока не публикуются: ни событиями,
+    ни сбросом публичных страниц.
+
+    Нужно служебным операциям вроде переноса между шардами: для
+    читателя заметки не меняются, хотя строки удаляются и создаются.
+    """
+    token = _muted.set(True)
+    try:
+        yield
+    finally:
+        _muted.reset(token)
+
+
+def is_muted():
+    return _muted.get()
+
+
+def note_event(action, note):
+    """Событие об изменении заметки без тяжёлого поля text."""
+    return {
+        'action': action,
+        'id': note.pk,
+        'slug': note.slug,
+        'title': note.title,
+    }
+
+
+def format_sse(event):
+    """Кодирует событие в формат text/event-stream."""
+    data = json.dumps(event, ensure_ascii=False)
+    return f'event: {event["action"]}\ndata: {data}\n\n'.encode()
@@ -1,9 +1,8 @@
-from pytils.translit import slugify
-
 from django import forms
 from django.core.exceptions import ValidationError
 
 from .models import Note
+from .slugs import slugify
 
 WARNING = ' - такой slug уже существует, придумайте уникальное значение!'
 
@@ -22,8 +21,6 @@ class NoteForm(forms.ModelForm):
         if not slug:
             title = cleaned_data.get('title')
             slug = slugify(title)[:100]
-        if Note.objects.filter(
-                slug=slug
-        ).exclude(id=self.instance.pk).exists():
+        if Note.objects.slug_exists(slug, exclude=self.instance):
             raise ValidationError(slug + WARNING)
         return slug
@@ -0,0 +1,69 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+from django.urls import reverse
+
+from notes.compression import ENCODINGS
+from notes.models import Note
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает размер и время ответов страниц заметок '
+            'без сжатия, с gzip и brotli, а также повторные запросы с ETag.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--notes', type=int, default=200)
+        parser.add_argument('--requests', type=int, default=20)
+
+    def handle(self, *args, **options):
+        # Данные создаются во временной транзакции и откатываются.
+        with transaction.atomic():
+            author = User.objects.create(username='benchmark-responses')
+            Note.objects.bulk_create(
+                Note(
+                    title=f'Заметка номер {index}',
+                    text='Текст заметки для замера. ' * 40,
+                    author=author,
+                )
+                for index in range(options['notes'])
+            )
+            note = Note.objects.for_author(author).first()
+            client = Client()
+            client.force_login(author)
+            for name, args in (
+                ('notes:list', None), ('notes:detail', (note.slug,))
+            ):
+                self.measure(client, reverse(name, args=args), options)
+            transaction.set_rollback(True)
+
+    def measure(self, client, url, options):
+        self.stdout.write(url)
+        variants = [('identity', 'identity'), ('gzip', 'gzip')]
+        if 'br' in ENCODINGS:
+            variants.append(('br', 'br, gzip'))
+        for label, encoding in variants:
+            started = time.perf_counter()
+            for _ in range(options['requests']):
+                response = client.get(url, HTTP_ACCEPT_ENCODING=encoding)
+            elapsed_ms = (
+                (time.perf_counter() - started) / options['requests'] * 1000
+            )
+            self.stdout.write(
+                f'  {label:<9} {len(response.content):>8} байт '
+                f'{response.get("Content-Encoding", "-"):<9}'
+                f'{elapsed_ms:>7.2f} мс'
+            )
+        # ETag у каждой кодировки свой: повторяем последний запрос.
+        revisit = client.get(
+            url, HTTP_ACCEPT_ENCODING=encoding,
+            HTTP_IF_NONE_MATCH=response.get('ETag', ''),
+        )
+        self.stdout.write(
+            f'  повторно  {len(revisit.content):>8} байт '
+            f'статус {revisit.status_code}'
+        )
@@ -0,0 +1,51 @@
+import random
+import timeit
+
+from django.core.management.base import BaseCommand
+
+from notes.slugs import slugify, slugify_many
+
+WORDS = (
+    'Заметка', 'список', 'покупок', 'на', 'неделю', 'Идеи', 'для',
+    'проекта', '«Весна»', 'встреча', '№5', 'и', 'обед', '&', 'план',
+)
+
+
+def make_titles(count, unique):
+    rng = random.Random(count)
+    pool = [
+        ' '.join(rng.choice(WORDS) for _ in range(rng.randint(2, 8)))
+        for _ in range(unique)
+    ]
+    return [rng.choice(pool) for _ in range(count)]
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает скорость pytils.translit.slugify и notes.slugs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=10000)
+        parser.add_argument('--unique', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        from pytils.translit import slugify as pytils_slugify
+
+        titles = make_titles(options['titles'], options['unique'])
+        cases = (
+            ('pytils.translit.slugify',
+             lambda: [pytils_slugify(title) for title in titles]),
+            ('notes.slugs.slugify (LRU)',
+             lambda: [slugify(title) for title in titles]),
+            ('notes.slugs.slugify_many', lambda: slugify_many(titles)),
+        )
+        baseline = None
+        for name, case in cases:
+            slugify.cache_clear()
+            best = min(timeit.repeat(case, number=1, repeat=options['repeat']))
+            per_title_us = best / len(titles) * 1_000_000
+            baseline = baseline or per_title_us
+            self.stdout.write(
+                f'{name:<28} {per_title_us:>8.2f} мкс/заголовок '
+                f'x{baseline / per_title_us:.1f}'
+            )
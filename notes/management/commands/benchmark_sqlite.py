@@ -0,0 +1,134 @@
+import contextlib
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.test import override_settings
+
+from notes.db import is_locked, lock_backoff
+
+# Временный псевдоним: нагрузка идёт через django.db.connections, то есть
+# с configure_sqlite, CONN_MAX_AGE и таймаутом соединений Django.
+ALIAS = 'benchmark'
+SCHEMA = (
+    'CREATE TABLE note ('
+    'id INTEGER PRIMARY KEY, author_id INTEGER, title TEXT, text TEXT)',
+    'CREATE INDEX note_author ON note (author_id)',
+)
+
+
+@contextlib.contextmanager
+def benchmark_database(conn_max_age):
+    """Подключает временную базу как ещё один псевдоним DATABASES."""
+    with tempfile.TemporaryDirectory() as directory:
+        connections.settings[ALIAS] = {
+            **connections.settings[DEFAULT_DB_ALIAS],
+            'NAME': str(Path(directory) / 'benchmark.sqlite3'),
+            'CONN_MAX_AGE': conn_max_age,
+        }
+        try:
+            with connections[ALIAS].cursor() as cursor:
+                for statement in SCHEMA:
+                    cursor.execute(statement)
+            yield
+        finally:
+            connections[ALIAS].close()
+            del connections[ALIAS]
+            del connections.settings[ALIAS]
+
+
+def worker(deadline, write_ratio, index, stats):
+    operations = retries = errors = 0
+    counter = 0
+    while time.perf_counter() < deadline:
+        counter += 1
+        attempt = 0
+        connection = connections[ALIAS]
+        while True:
+            try:
+                with connection.cursor() as cursor:
+                    if counter % 100 < write_ratio:
+                        cursor.execute(
+                            'INSERT INTO note (author_id, title, text) '
+                            'VALUES (%s, %s, %s)',
+                            (index, f'Заметка {counter}', 'Текст ' * 50),
+                        )
+                    else:
+                        cursor.execute(
+                            'SELECT id, title FROM note WHERE author_id = %s '
+                            'ORDER BY id DESC LIMIT 20', (index,)
+                        )
+                        cursor.fetchall()
+                operations += 1
+                break
+            except OperationalError as error:
+                if not is_locked(error):
+                    raise
+                retries += 1
+                if attempt >= settings.SQLITE_LOCK_RETRIES:
+                    errors += 1
+                    break
+                time.sleep(lock_backoff(attempt))
+                attempt += 1
+        # Конец «запроса»: как и по сигналу request_finished, соединение
+        # закрывается, если CONN_MAX_AGE истёк или равен нулю.
+        connection.close_if_unusable_or_obsolete()
+    connections[ALIAS].close()
+    with stats['lock']:
+        stats['operations'] += operations
+        stats['retries'] += retries
+        stats['errors'] += errors
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает пропускную способность SQLite при смешанной '
+            'нагрузке со стандартными настройками Django и с SQLITE_PRAGMAS '
+            'и постоянными соединениями.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--seconds', type=float, default=3)
+        parser.add_argument(
+            '--write-percent', type=int, default=20,
+            help='Доля записей в нагрузке, %%.',
+        )
+
+    def run(self, options):
+        stats = {
+            'operations': 0, 'retries': 0, 'errors': 0,
+            'lock': threading.Lock(),
+        }
+        deadline = time.perf_counter() + options['seconds']
+        threads = [
+            threading.Thread(target=worker, args=(
+                deadline, options['write_percent'], index, stats,
+            ))
+            for index in range(options['threads'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return stats
+
+    def handle(self, *args, **options):
+        # Стандартный профиль Django: без PRAGMA, соединение на каждый
+        # запрос, таймаут блокировки sqlite3 по умолчанию — 5 с.
+        for label, pragmas, conn_max_age in (
+            ('Django по умолчанию', {}, 0),
+            ('SQLITE_PRAGMAS', settings.SQLITE_PRAGMAS,
+             settings.CONN_MAX_AGE),
+        ):
+            with override_settings(SQLITE_PRAGMAS=pragmas):
+                with benchmark_database(conn_max_age):
+                    stats = self.run(options)
+            self.stdout.write(
+                f'{label:<20} '
+                f'{stats["operations"] / options["seconds"]:>10.0f} опер./с '
+                f'повторов: {stats["retries"]:>6} '
+                f'ошибок блокировки: {stats["errors"]}'
+            )
@@ -0,0 +1,115 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Выполняется в отдельном процессе, чтобы старт был действительно холодным.
+# Модули приложений реестр грузит через import_module, которого
+# не видит -X importtime, поэтому эти импорты замеряются отдельно.
+CHILD = '''
+import json, time
+start = time.perf_counter()
+import django
+import django.apps.config as config
+registry = {{}}
+def timed_import(name, package=None, _import=config.import_module):
+    started = time.perf_counter()
+    try:
+        return _import(name, package)
+    finally:
+        registry.setdefault(name, (time.perf_counter() - started) * 1000)
+config.import_module = timed_import
+django.setup(set_prefix=False)
+setup = time.perf_counter()
+import {module}
+ready = time.perf_counter()
+print(json.dumps({{
+    'setup_ms': (setup - start) * 1000,
+    'total_ms': (ready - start) * 1000,
+    'registry': registry,
+}}))
+'''
+
+
+def parse_importtime(stderr):
+    """Разбирает вывод -X importtime в словарь модуль -> (self, cumulative).
+
+    Время в выводе указано в микросекундах.
+    """
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def cold_start(module):
+    """Один холодный старт: общие времена и времена импорта модулей."""
+    env = dict(os.environ)
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings')
+    code = CHILD.format(module=module)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=settings.BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode:
+        raise CommandError(result.stderr.strip().splitlines()[-1])
+    return json.loads(result.stdout), parse_importtime(result.stderr)
+
+
+class Command(BaseCommand):
+    help = ('Измеряет время холодного старта и показывает самые медленные '
+            'при импорте модули.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--module', default='yanote.wsgi')
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument('--top', type=int, default=15)
+        parser.add_argument(
+            '--max-ms', type=float, default=settings.STARTUP_BUDGET_MS,
+            help='Порог регрессии для медианы холодного старта, мс.',
+        )
+
+    def handle(self, *args, **options):
+        runs = [
+            cold_start(options['module']) for _ in range(options['repeat'])
+        ]
+        total_ms = statistics.median(run['total_ms'] for run, _ in runs)
+        setup_ms = statistics.median(run['setup_ms'] for run, _ in runs)
+        last_run, timings = runs[-1]
+        registry = sorted(
+            last_run['registry'].items(), key=lambda item: item[1],
+            reverse=True,
+        )[:options['top']]
+        self.stdout.write('Загрузка реестра приложений:')
+        for name, elapsed_ms in registry:
+            self.stdout.write(f'{elapsed_ms:>10.1f}  {name}')
+        worst = sorted(
+            timings.items(), key=lambda item: item[1][0], reverse=True
+        )[:options['top']]
+        self.stdout.write('Импорт модулей (-X importtime):')
+        self.stdout.write(f'{"self, мс":>10} {"всего, мс":>10}  модуль')
+        for name, (self_us, cumulative_us) in worst:
+            self.stdout.write(
+                f'{self_us / 1000:>10.1f} {cumulative_us / 1000:>10.1f}  '
+                f'{name}'
+            )
+        self.stdout.write(
+            f'django.setup(): {setup_ms:.1f} мс, '
+            f'холодный старт {options["module"]}: {total_ms:.1f} мс '
+            f'(медиана из {options["repeat"]})'
+        )
+        if options['max_ms'] and total_ms > options['max_ms']:
+            raise CommandError(
+                f'Холодный старт {total_ms:.1f} мс превышает порог '
+                f'{options["max_ms"]:.1f} мс.'
+            )
@@ -0,0 +1,186 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from notes.events import muted
+from notes.models import AuthorShard, Note
+from notes.sharding import get_shards, hash_shard, shard_for_author
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Переносит заметки авторов между шардами без остановки сервиса.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--author', type=int, action='append', dest='authors',
+            help='id автора; по умолчанию обрабатываются все авторы.',
+        )
+        parser.add_argument(
+            '--to', dest='target',
+            help='Целевой шард; по умолчанию — шард по хэшу id автора.',
+        )
+        parser.add_argument(
+            '--pin', action='store_true',
+            help=('Только записать текущий шард каждого автора в каталог; '
+                  'запускается перед изменением NOTES_SHARD_COUNT.'),
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--freeze-batch', type=int, default=100,
+            help='Сколько авторов замораживать перед одним ожиданием grace.',
+        )
+        parser.add_argument(
+            '--grace', type=float, default=1.0,
+            help=('Сколько секунд после заморозки авторов ждать записей, '
+                  'начатых до неё.'),
+        )
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        target = options['target']
+        if target is not None and target not in get_shards():
+            raise CommandError(f'Неизвестный шард: {target}')
+        author_ids = options['authors'] or User.objects.values_list(
+            'pk', flat=True
+        ).iterator()
+        if options['pin']:
+            self.pin_authors(author_ids, options['dry_run'])
+            return
+        moved = 0
+        batch = []
+        for author_id in author_ids:
+            current = shard_for_author(author_id)
+            destination = target or hash_shard(author_id)
+            sources = self.find_sources(author_id, destination)
+            if not sources and current == destination:
+                continue
+            self.stdout.write(
+                f'Автор {author_id}: {", ".join(sources) or current} '
+                f'-> {destination}'
+            )
+            moved += 1
+            if options['dry_run']:
+                continue
+            if not sources:
+                # Заметок нет: переносить нечего, хватает записи в каталоге.
+                AuthorShard.objects.update_or_create(
+                    author_id=author_id,
+                    defaults={'alias': destination, 'frozen': False},
+                )
+                continue
+            batch.append((author_id, current, sources, destination))
+            if len(batch) >= options['freeze_batch']:
+                self.move_authors(batch, options)
+                batch = []
+        if batch:
+            self.move_authors(batch, options)
+        self.stdout.write(self.style.SUCCESS(f'Перенесено авторов: {moved}'))
+
+    def pin_authors(self, author_ids, dry_run):
+        """Закрепляет авторов без записи в каталоге за их текущим шардом.
+
+        После роста NOTES_SHARD_COUNT хэш таких авторов указывает
+        на новый шард, и без закрепления их заметки пропадут из чтения
+        до перебалансировки.
+        """
+        pins = [
+            AuthorShard(author_id=author_id, alias=shard_for_author(author_id))
+            for author_id in author_ids
+        ]
+        if not dry_run:
+            AuthorShard.objects.bulk_create(pins, ignore_conflicts=True)
+        self.stdout.write(
+            self.style.SUCCESS(f'Закреплено авторов: {len(pins)}')
+        )
+
+    @staticmethod
+    def find_sources(author_id, destination):
+        """Шарды, кроме целевого, где лежат заметки автора.
+
+        Каталогу здесь не доверяем: после изменения набора шардов
+        хэш автора мог уже указывать не туда, где лежат его строки.
+        """
+        return [
+            alias for alias in get_shards()
+            if alias != destination and Note.objects.using(alias).filter(
+                author_id=author_id
+            ).exists()
+        ]
+
+    def copy_notes(self, author_id, source, destination, batch_size):
+        """Копирует заметки автора, которых ещё нет в целевом шарде.
+
+        Уже скопированные slug пропускаются, поэтому прерванный
+        перенос можно просто запустить снова.
+        """
+        queryset = Note.objects.using(source).filter(
+            author_id=author_id
+        ).order_by('pk')
+        last_pk = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                return
+            last_pk = batch[-1].pk
+            copied = set(Note.objects.using(destination).filter(
+                slug__in=[note.slug for note in batch]
+            ).values_list('slug', flat=True))
+            copies = [
+                Note(
+                    title=note.title,
+                    text=note.text,
+                    slug=note.slug,
+                    author_id=note.author_id,
+                    share_key=note.share_key,
+                )
+                for note in batch if note.slug not in copied
+            ]
+            with transaction.atomic(using=destination):
+                Note.objects.using(destination).bulk_create(copies)
+
+    def move_authors(self, batch, options):
+        """Переносит пачку авторов с одним ожиданием grace на всю пачку.
+
+        Авторы замораживаются: Note.save и Note.delete отклоняют запись
+        в их заметки, а чтение продолжается из прежнего шарда. Выждав
+        grace секунд для уже начатых записей, команда по очереди
+        переносит заметки каждого автора и сразу его размораживает.
+        """
+        for author_id, current, sources, _ in batch:
+            readable = current
+            if current not in sources:
+                # Каталог уже указывает на шард без строк автора.
+                readable = sources[0]
+            AuthorShard.objects.update_or_create(
+                author_id=author_id,
+                defaults={'alias': readable, 'frozen': True},
+            )
+        time.sleep(options['grace'])
+        for author_id, _, sources, destination in batch:
+            self.move_author(
+                author_id, sources, destination, options['batch_size']
+            )
+
+    def move_author(self, author_id, sources, destination, batch_size):
+        """Копирует заметки замороженного автора, переключает каталог
+        и удаляет исходные строки.
+
+        Заморозка снимается только в самом конце, поэтому при сбое автор
+        остаётся замороженным до повторного запуска и правки не теряются.
+        """
+        for source in sources:
+            self.copy_notes(author_id, source, destination, batch_size)
+        AuthorShard.objects.filter(author_id=author_id).update(
+            alias=destination
+        )
+        # Для подписчиков заметки не исчезли, а лишь переехали.
+        with muted():
+            for source in sources:
+                Note.objects.using(source).filter(
+                    author_id=author_id
+                ).delete()
+        AuthorShard.objects.filter(author_id=author_id).update(frozen=False)
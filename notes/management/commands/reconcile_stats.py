@@ -0,0 +1,30 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from notes.sharding import get_shards
+from notes.stats import reconcile
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает статистику авторов пачками и исправляет расхождения.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        fixed = 0
+        for alias in get_shards():
+            last_pk = 0
+            while True:
+                author_ids = list(
+                    User.objects.filter(pk__gt=last_pk).order_by(
+                        'pk'
+                    ).values_list('pk', flat=True)[:options['batch_size']]
+                )
+                if not author_ids:
+                    break
+                last_pk = author_ids[-1]
+                fixed += reconcile(author_ids, alias)
+        self.stdout.write(self.style.SUCCESS(f'Исправлено строк: {fixed}'))
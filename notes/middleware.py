@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.http import Http404, HttpResponseNotFound
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+from .compression import compress_response
+from .share import SHARE_PREFIX, shared_response
+
+
+class SharedNoteMiddleware:
+    """Отдаёт публичные заметки до сессий, аутентификации и URLconf.
+
+    Должен стоять в MIDDLEWARE раньше SessionMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefix = '/' + SHARE_PREFIX
+
+    def __call__(self, request):
+        path = request.path_info
+        if request.method not in ('GET', 'HEAD') or not path.startswith(
+            self.prefix
+        ):
+            return self.get_response(request)
+        token = path[len(self.prefix):].rstrip('/')
+        try:
+            return shared_response(request, token)
+        except Http404:
+            return HttpResponseNotFound()
+
+
+class ResponsePolicyMiddleware:
+    """Заголовки кэширования по имени маршрута и сжатие ответов.
+
+    Правила берутся из RESPONSE_CACHE_POLICY и применяются только
+    к успешным ответам, у которых Cache-Control ещё не задан.
+    Должен стоять в MIDDLEWARE после ConditionalGetMiddleware: тогда
+    ETag соответствует отправленному телу, а ответ 304 копирует
+    заголовки политики из полного ответа.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.policy = settings.RESPONSE_CACHE_POLICY
+        self.min_size = settings.RESPONSE_COMPRESSION_MIN_SIZE
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        match = getattr(request, 'resolver_match', None)
+        rules = self.policy.get(match.view_name) if match else None
+        if (
+            rules is not None
+            and response.status_code == 200
+            and not response.has_header('Cache-Control')
+        ):
+            patch_cache_control(response, **rules.get('cache_control', {}))
+            patch_vary_headers(response, rules.get('vary', ()))
+        return compress_response(request, response, self.min_size)
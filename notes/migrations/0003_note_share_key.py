@@ -0,0 +1,18 @@
+# Generated by Django 3.2.15 on 2026-10-19 09:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0002_author_shards'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='note',
+            name='share_key',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=32, verbose_name='Ключ публичной ссылки'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 3.2.15 on 2026-10-19 09:20
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('notes', '0003_note_share_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('author', models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('note_count', models.IntegerField(default=0, verbose_name='Количество заметок')),
+                ('text_length', models.BigIntegerField(default=0, verbose_name='Общий объём текста')),
+                ('last_activity', models.DateTimeField(blank=True, null=True, verbose_name='Последнее изменение')),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.15 on 2026-10-19 09:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0004_author_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='authorshard',
+            name='frozen',
+            field=models.BooleanField(default=False, verbose_name='Идёт перенос'),
+        ),
+    ]
@@ -1,7 +1,67 @@
+import secrets
+
 from django.conf import settings
-from django.db import models
+from django.db import models, router, transaction
+from django.urls import reverse
+
+from .db import retry_on_lock
+from .share import drop_page, make_token
+from .sharding import get_shards, shard_for_author
+from .slugs import slugify, slugify_many
+from .stats import STATS_FIELDS, field_names, record_bulk_create, snapshot
+
+
+class NoteQuerySet(models.QuerySet):
+
+    def for_author(self, author):
+        """Заметки автора из его шарда."""
+        return self.using(shard_for_author(author.pk)).filter(author=author)
+
+    def create(self, **kwargs):
+        """Без явного using заметка сохраняется в шард автора."""
+        if self._db is not None:
+            return super().create(**kwargs)
+        note = self.model(**kwargs)
+        note.save(force_insert=True)
+        return note
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """Заполняет пустые slug одним пакетным вызовом транслитерации.
+
+        Без явного using заметки раскладываются по шардам их авторов.
+        """
+        objs = list(objs)
+        without_slug = [note for note in objs if not note.slug]
+        max_slug_length = self.model._meta.get_field('slug').max_length
+        slugs = slugify_many(note.title for note in without_slug)
+        for note, slug in zip(without_slug, slugs):
+            note.slug = slug[:max_slug_length]
+        if self._db is None and len(get_shards()) > 1:
+            groups = {}
+            for note in objs:
+                groups.setdefault(note.author_id, []).append(note)
+            for author_id, notes in groups.items():
+                alias = shard_for_author(author_id, for_write=True)
+                self.using(alias).bulk_create(notes, *args, **kwargs)
+            return objs
+        with transaction.atomic(using=self.db):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            record_bulk_create(objs, self.db)
+        return objs
+
+    def slug_exists(self, slug, exclude=None):
+        """Проверяет уникальность slug во всех шардах.
 
-from pytils.translit import slugify
+        pk уникален только внутри шарда, поэтому заметка exclude
+        исключается лишь из той базы, из которой она загружена.
+        """
+        for alias in get_shards():
+            queryset = self.using(alias).filter(slug=slug)
+            if exclude is not None and exclude._state.db == alias:
+                queryset = queryset.exclude(pk=exclude.pk)
+            if queryset.exists():
+                return True
+        return False
 
 
 class Note(models.Model):
@@ -26,13 +86,122 @@ class Note(models.Model):
     author = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
+        # Заметка может лежать в другом шарде, чем пользователь.
+        db_constraint=False,
+    )
+    share_key = models.CharField(
+        'Ключ публичной ссылки',
+        max_length=32,
+        blank=True,
+        db_index=True,
+        editable=False,
     )
 
+    objects = NoteQuerySet.as_manager()
+
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        note = super().from_db(db, field_names, values)
+        if not {'author_id', 'text'} & note.get_deferred_fields():
+            snapshot(note)
+        return note
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        reloaded = fields is None or STATS_FIELDS <= field_names(self, fields)
+        if reloaded and not {'author_id', 'text'} & self.get_deferred_fields():
+            snapshot(self)
+        else:
+            # Снимок устарел: pre_save дочитает старые значения из базы.
+            self.__dict__.pop('_stats_snapshot', None)
+
+    @retry_on_lock
     def save(self, *args, **kwargs):
         if not self.slug:
             max_slug_length = self._meta.get_field('slug').max_length
             self.slug = slugify(self.title)[:max_slug_length]
-        super().save(*args, **kwargs)
+        # Шард ищется один раз и передаётся дальше, чтобы Model.save
+        # не обращался к каталогу шардов повторно.
+        kwargs['using'] = kwargs.get('using') or router.db_for_write(
+            type(self), instance=self
+        )
+        # Счётчики AuthorStats обновляются в той же транзакции.
+        with transaction.atomic(using=kwargs['using']):
+            super().save(*args, **kwargs)
+
+    @retry_on_lock
+    def delete(self, *args, **kwargs):
+        kwargs['using'] = kwargs.get('using') or router.db_for_write(
+            type(self), instance=self
+        )
+        return super().delete(*args, **kwargs)
+
+    def get_share_url(self):
+        """Публичная подписанная ссылка или None, если заметка скрыта."""
+        if not self.share_key:
+            return None
+        return reverse('notes:shared', args=(make_token(self.share_key),))
+
+    def share(self):
+        """Открывает публичный доступ к заметке.
+
+        Страницу в кэш кладёт post_save после коммита, заодно заменяя
+        возможную метку MISSING.
+        """
+        if not self.share_key:
+            self.share_key = secrets.token_hex(16)
+            self.save(update_fields=('share_key',))
+
+    def unshare(self):
+        """Отзывает публичную ссылку: старая подпись больше не действует.
+
+        Сначала сохраняется пустой ключ, и только после коммита страница
+        по старому ключу заменяется меткой, чтобы её не вернул в кэш
+        параллельный запрос.
+        """
+        if self.share_key:
+            share_key = self.share_key
+            self.share_key = ''
+            self.save(update_fields=('share_key',))
+            drop_page(share_key, self._state.db)
+
+
+class AuthorShard(models.Model):
+    """Явное назначение автора шарду после перебалансировки."""
+    author = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+    )
+    alias = models.CharField('Псевдоним базы данных', max_length=100)
+    # Пока заметки переносятся, запись в них отклоняется.
+    frozen = models.BooleanField('Идёт перенос', default=False)
+
+    def __str__(self):
+        return f'{self.author_id} -> {self.alias}'
+
+
+class AuthorStats(models.Model):
+    """Счётчики автора; хранятся в шарде автора рядом с его заметками."""
+    author = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        db_constraint=False,
+    )
+    note_count = models.IntegerField('Количество заметок', default=0)
+    text_length = models.BigIntegerField('Общий объём текста', default=0)
+    last_activity = models.DateTimeField(
+        'Последнее изменение', null=True, blank=True
+    )
+
+    @classmethod
+    def for_author(cls, author):
+        """Статистика автора одним запросом по первичному ключу."""
+        stats = cls.objects.using(shard_for_author(author.pk)).filter(
+            pk=author.pk
+        ).first()
+        return stats or cls(author=author)
@@ -0,0 +1,85 @@
+from http import HTTPStatus
+
+from django.contrib.admin.models import DELETION, LogEntry
+from django.urls import reverse
+from pytest_django.asserts import assertRedirects
+
+from notes.admin import SHARDED_MESSAGE, EstimatedCountPaginator
+from notes.models import Note
+
+CHANGELIST = reverse('admin:notes_note_changelist')
+
+
+def test_changelist_available(admin_client, note):
+    response = admin_client.get(CHANGELIST)
+    assert response.status_code == HTTPStatus.OK
+    assert note.title in response.content.decode()
+
+
+def test_changelist_queries_do_not_grow(
+        admin_client, author, django_assert_max_num_queries
+):
+    Note.objects.bulk_create(
+        Note(title=f'Заметка {i}', text='Текст', slug=f'n-{i}', author=author)
+        for i in range(50)
+    )
+    with django_assert_max_num_queries(10) as captured:
+        admin_client.get(CHANGELIST)
+    # Число строк оценивается по MAX(pk), а не считается COUNT(*).
+    assert not [
+        query for query in captured.captured_queries
+        if 'COUNT(' in query['sql'].upper()
+    ]
+
+
+def test_paginator_estimates_unfiltered_count(note):
+    paginator = EstimatedCountPaginator(Note.objects.order_by('pk'), 100)
+    assert paginator.count == note.pk
+    filtered = Note.objects.filter(slug=note.slug).order_by('pk')
+    assert EstimatedCountPaginator(filtered, 100).count == 1
+
+
+def test_delete_in_batches(admin_client, note):
+    admin_client.post(CHANGELIST, {
+        'action': 'delete_in_batches',
+        '_selected_action': [note.pk],
+    })
+    assert Note.objects.count() == 0
+    entry = LogEntry.objects.get()
+    assert (entry.action_flag, entry.object_id, entry.object_repr) == (
+        DELETION, str(note.pk), note.title
+    )
+
+
+def test_reassign_author(admin_client, admin_user, note):
+    admin_client.post(CHANGELIST, {
+        'action': 'reassign_author',
+        '_selected_action': [note.pk],
+        'author': admin_user.pk,
+    })
+    note.refresh_from_db()
+    assert note.author == admin_user
+
+
+def test_reassign_requires_existing_author(admin_client, author, note):
+    admin_client.post(CHANGELIST, {
+        'action': 'reassign_author',
+        '_selected_action': [note.pk],
+        'author': 'abc',
+    })
+    note.refresh_from_db()
+    assert note.author == author
+
+
+def test_note_admin_disabled_with_shards(admin_client, settings, note):
+    settings.NOTES_SHARDS = ['default', 'notes_shard_1']
+    change_url = reverse('admin:notes_note_change', args=(note.pk,))
+    for url in (CHANGELIST, change_url):
+        response = admin_client.get(url, follow=True)
+        assertRedirects(response, reverse('admin:index'))
+        assert SHARDED_MESSAGE in response.content.decode()
+    admin_client.post(CHANGELIST, {
+        'action': 'delete_in_batches',
+        '_selected_action': [note.pk],
+    })
+    assert Note.objects.filter(pk=note.pk).exists()
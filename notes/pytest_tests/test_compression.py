@@ -0,0 +1,103 @@
+import gzip
+from http import HTTPStatus
+
+import brotli
+import pytest
+from django.urls import reverse
+
+from notes.compression import accepted_encodings
+from notes.models import Note
+from notes.storage import CompressedStaticFilesStorage
+
+LIST_URL = reverse('notes:list')
+
+
+@pytest.fixture
+def many_notes(author):
+    Note.objects.bulk_create(
+        Note(title=f'Заметка {i}', text='Текст', author=author)
+        for i in range(50)
+    )
+
+
+def test_list_compressed_with_gzip(author_client, many_notes):
+    plain = author_client.get(LIST_URL)
+    response = author_client.get(LIST_URL, HTTP_ACCEPT_ENCODING='gzip')
+    assert response['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response['Vary']
+    assert len(response.content) < len(plain.content)
+    assert gzip.decompress(response.content) == plain.content
+
+
+def test_list_compressed_with_brotli(author_client, many_notes):
+    plain = author_client.get(LIST_URL)
+    response = author_client.get(LIST_URL, HTTP_ACCEPT_ENCODING='br, gzip')
+    assert response['Content-Encoding'] == 'br'
+    assert brotli.decompress(response.content) == plain.content
+
+
+@pytest.mark.parametrize('header', ('identity', 'gzip;q=0', ''))
+def test_not_compressed_if_not_accepted(author_client, many_notes, header):
+    response = author_client.get(LIST_URL, HTTP_ACCEPT_ENCODING=header)
+    assert not response.has_header('Content-Encoding')
+
+
+def test_small_response_not_compressed(author_client, settings, note):
+    settings.RESPONSE_COMPRESSION_MIN_SIZE = 10 ** 6
+    response = author_client.get(LIST_URL, HTTP_ACCEPT_ENCODING='gzip')
+    assert not response.has_header('Content-Encoding')
+
+
+def test_accepted_encodings():
+    header = 'gzip;q=0.8, br;q=0, deflate'
+    assert accepted_encodings(header) == {'gzip', 'deflate'}
+
+
+@pytest.mark.parametrize(
+    'name, args, directive',
+    (
+        ('notes:list', None, 'no-cache'),
+        ('notes:detail', ('note-slug',), 'no-cache'),
+        ('notes:add', None, 'no-store'),
+        ('notes:edit', ('note-slug',), 'no-store'),
+        ('users:login', None, 'no-store'),
+        ('users:logout', None, 'no-store'),
+        ('users:signup', None, 'no-store'),
+    )
+)
+def test_cache_control_policy(author_client, note, name, args, directive):
+    response = author_client.get(reverse(name, args=args))
+    cache_control = response['Cache-Control']
+    assert 'private' in cache_control
+    assert directive in cache_control
+
+
+@pytest.mark.parametrize('encoding', ('identity', 'gzip', 'br'))
+def test_revisit_not_modified(author_client, many_notes, encoding):
+    first = author_client.get(LIST_URL, HTTP_ACCEPT_ENCODING=encoding)
+    response = author_client.get(
+        LIST_URL, HTTP_ACCEPT_ENCODING=encoding,
+        HTTP_IF_NONE_MATCH=first['ETag'],
+    )
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    for header in ('ETag', 'Cache-Control', 'Vary'):
+        assert response[header] == first[header]
+
+
+def test_etag_differs_between_encodings(author_client, many_notes):
+    etags = {
+        author_client.get(LIST_URL, HTTP_ACCEPT_ENCODING=encoding)['ETag']
+        for encoding in ('identity', 'gzip', 'br')
+    }
+    assert len(etags) == 3
+
+
+def test_collectstatic_precompresses(tmp_path):
+    (tmp_path / 'app.css').write_text('body { color: red; }\n' * 100)
+    (tmp_path / 'logo.png').write_bytes(b'\x89PNG' * 500)
+    storage = CompressedStaticFilesStorage(location=tmp_path)
+    processed = list(storage.post_process({'app.css': None, 'logo.png': None}))
+    assert ('app.css', 'app.css.gz', True) in processed
+    assert ('app.css', 'app.css.br', True) in processed
+    assert (tmp_path / 'app.css.gz').exists()
+    assert not (tmp_path / 'logo.png.gz').exists()
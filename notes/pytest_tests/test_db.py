@@ -0,0 +1,92 @@
+import pytest
+from django.db import OperationalError, connection, connections, transaction
+from django.test.utils import CaptureQueriesContext
+
+from notes import db
+from notes.models import AuthorShard, Note
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(db.time, 'sleep', lambda seconds: None)
+
+
+@pytest.fixture
+def own_author(django_user_model):
+    # Транзакционные тесты очищают базу, засеянных данных в них нет.
+    return django_user_model.objects.create(username='Другой автор')
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'pragma, expected',
+    (('busy_timeout', 5000), ('synchronous', 1), ('cache_size', -65536)),
+)
+def test_pragmas_applied(pragma, expected):
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA {pragma}')
+        assert cursor.fetchone()[0] == expected
+
+
+def test_lock_backoff_is_bounded(settings):
+    for attempt in range(10):
+        delay = db.lock_backoff(attempt)
+        assert 0 < delay <= settings.SQLITE_LOCK_RETRY_MAX_DELAY
+
+
+def locked_then_saved(monkeypatch, failures):
+    calls = []
+    original = Note.save_base
+
+    def save_base(self, *args, **kwargs):
+        calls.append(1)
+        if len(calls) <= failures:
+            raise OperationalError('database is locked')
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(Note, 'save_base', save_base)
+    return calls
+
+
+@pytest.mark.django_db(transaction=True)
+def test_save_retried_on_lock(own_author, monkeypatch, no_sleep):
+    calls = locked_then_saved(monkeypatch, failures=2)
+    Note.objects.create(title='Заголовок', text='Текст', author=own_author)
+    assert len(calls) == 3
+    assert Note.objects.count() == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_save_not_retried_in_outer_transaction(
+        own_author, monkeypatch, no_sleep
+):
+    calls = locked_then_saved(monkeypatch, failures=1)
+    with pytest.raises(OperationalError):
+        with transaction.atomic():
+            Note.objects.create(
+                title='Заголовок', text='Текст', author=own_author
+            )
+    assert len(calls) == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_retries_limited(own_author, monkeypatch, no_sleep, settings):
+    calls = locked_then_saved(monkeypatch, failures=100)
+    with pytest.raises(OperationalError):
+        Note.objects.create(title='Заголовок', text='Текст', author=own_author)
+    assert len(calls) == settings.SQLITE_LOCK_RETRIES + 1
+
+
+@pytest.mark.django_db(databases=['default', 'notes_shard_1'])
+def test_shard_resolved_once_per_write(settings, author):
+    settings.NOTES_SHARDS = ['default', 'notes_shard_1']
+    note = Note.objects.create(title='Заголовок', text='Текст', author=author)
+    directory = AuthorShard._meta.db_table
+    for write in (note.save, note.delete):
+        with CaptureQueriesContext(connections['default']) as captured:
+            write()
+        lookups = [
+            query for query in captured.captured_queries
+            if directory in query['sql']
+        ]
+        assert len(lookups) == 1
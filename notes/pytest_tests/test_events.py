@@ -0,0 +1,95 @@
+import asyncio
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.management import call_command
+
+from notes.events import broker, note_event
+from notes.models import Note
+from notes.tests.factories import create_notes
+from notes.sse import EVENTS_PATH, note_events
+
+
+def make_scope(client):
+    cookie = client.cookies.get(settings.SESSION_COOKIE_NAME)
+    headers = []
+    if cookie is not None:
+        headers.append(
+            (b'cookie', f'{cookie.key}={cookie.value}'.encode())
+        )
+    return {'type': 'http', 'path': EVENTS_PATH, 'headers': headers}
+
+
+@async_to_sync
+async def stream(scope, author_id=None, events=()):
+    """Подключается к потоку, публикует события и отключается."""
+    messages = []
+    disconnected = asyncio.Event()
+
+    async def receive():
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        messages.append(message)
+        if message['type'] == 'http.response.start':
+            for event in events:
+                broker.publish(author_id, event)
+        if message.get('body') or not events:
+            disconnected.set()
+
+    await asyncio.wait_for(note_events(scope, receive, send), timeout=5)
+    return messages
+
+
+def test_anonymous_user_gets_forbidden(client):
+    messages = stream(make_scope(client))
+    assert messages[0]['status'] == HTTPStatus.FORBIDDEN
+
+
+def test_author_receives_own_events(author_client, author, note):
+    event = note_event('updated', note)
+    messages = stream(make_scope(author_client), author.pk, [event])
+    assert messages[0]['status'] == HTTPStatus.OK
+    body = messages[1]['body'].decode()
+    assert body.startswith('event: updated\n')
+    assert note.slug in body
+
+
+def test_note_changes_published_after_commit(
+        author, monkeypatch, django_capture_on_commit_callbacks
+):
+    received = []
+    monkeypatch.setattr(
+        broker, 'publish', lambda author_id, event: received.append(event)
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        note = Note.objects.create(
+            title='Заголовок', text='Текст', slug='slug', author=author
+        )
+        note.title = 'Новый заголовок'
+        note.save()
+        note.delete()
+    actions = [event['action'] for event in received]
+    assert actions == ['created', 'updated', 'deleted']
+
+
+@pytest.mark.django_db(databases=['default', 'notes_shard_1'])
+def test_rebalance_publishes_no_events(
+        settings, author, monkeypatch, django_capture_on_commit_callbacks
+):
+    create_notes(author, count=2)
+    settings.NOTES_SHARDS = ['default', 'notes_shard_1']
+    received = []
+    monkeypatch.setattr(
+        broker, 'publish', lambda author_id, event: received.append(event)
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        call_command(
+            'rebalance_notes', author=[author.pk], to='notes_shard_1',
+            grace=0,
+        )
+    assert Note.objects.for_author(author).count() == 2
+    assert received == []
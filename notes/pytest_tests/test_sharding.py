@@ -0,0 +1,232 @@
+from http import HTTPStatus
+
+import pytest
+
+from django.core.management import call_command, load_command_class
+from django.test import override_settings
+from django.urls import reverse
+
+from notes.forms import NoteForm
+from notes.management.commands import rebalance_notes
+from notes.models import AuthorShard, AuthorStats, Note
+from notes.routers import NoteShardRouter
+from notes.share import get_page
+from notes.sharding import AuthorMoving, hash_shard, shard_for_author
+from notes.tests.factories import create_notes, create_users
+
+SHARDS = ['default', 'notes_shard_1', 'notes_shard_2']
+# Тесты с настоящими базами всех шардов.
+multi_db = pytest.mark.django_db(databases=SHARDS)
+
+
+@pytest.fixture
+def shards(settings):
+    settings.NOTES_SHARDS = SHARDS
+    settings.SQLITE_LOCK_RETRIES = 0
+
+
+@pytest.fixture
+def moved_author(db):
+    """Автор, чей хэш при трёх шардах указывает не на основную базу."""
+    users = create_users(*(f'Автор {index}' for index in range(10)))
+    with override_settings(NOTES_SHARDS=SHARDS):
+        return next(
+            user for user in users if hash_shard(user.pk) != 'default'
+        )
+
+
+def test_single_shard_is_default(author):
+    assert shard_for_author(author.pk) == 'default'
+
+
+def test_hash_shard_is_stable(settings):
+    settings.NOTES_SHARDS = SHARDS
+    shards = [hash_shard(author_id) for author_id in range(1, 100)]
+    assert shards == [hash_shard(author_id) for author_id in range(1, 100)]
+    assert set(shards) == set(SHARDS)
+
+
+def test_directory_overrides_hash(settings, author):
+    settings.NOTES_SHARDS = SHARDS
+    target = next(alias for alias in SHARDS if alias != hash_shard(author.pk))
+    AuthorShard.objects.create(author=author, alias=target)
+    assert shard_for_author(author.pk) == target
+
+
+def test_router_sends_note_to_author_shard(settings, author):
+    settings.NOTES_SHARDS = SHARDS
+    router = NoteShardRouter()
+    note = Note(author=author)
+    assert router.db_for_write(Note, instance=note) == hash_shard(author.pk)
+    assert router.db_for_read(type(author), instance=note) == 'default'
+
+
+@pytest.mark.parametrize(
+    'db, model_name, expected',
+    (
+        ('default', 'authorshard', None),
+        ('notes_shard_1', 'note', True),
+        ('notes_shard_1', 'authorshard', False),
+    )
+)
+def test_router_allow_migrate(settings, db, model_name, expected):
+    settings.NOTES_SHARDS = SHARDS
+    router = NoteShardRouter()
+    assert router.allow_migrate(db, 'notes', model_name) is expected
+
+
+def test_rebalance_without_shards_moves_nothing(note, capsys):
+    call_command('rebalance_notes')
+    assert 'Перенесено авторов: 0' in capsys.readouterr().out
+    assert Note.objects.for_author(note.author).count() == 1
+
+
+@multi_db
+def test_create_and_for_author_use_author_shard(shards, author):
+    note = Note.objects.create(title='Заметка', text='Текст', author=author)
+    shard = hash_shard(author.pk)
+    assert note._state.db == shard
+    assert Note.objects.using(shard).filter(pk=note.pk).exists()
+    assert list(Note.objects.for_author(author)) == [note]
+    assert AuthorStats.for_author(author).note_count == 1
+
+
+@multi_db
+def test_bulk_create_uses_author_shards(shards, author, moved_author):
+    Note.objects.bulk_create(
+        Note(title=f'Заметка {i}', text='Текст', author=user)
+        for i, user in enumerate((author, moved_author, moved_author))
+    )
+    for user, count in ((author, 1), (moved_author, 2)):
+        shard = hash_shard(user.pk)
+        assert Note.objects.using(shard).filter(author=user).count() == count
+        assert Note.objects.for_author(user).count() == count
+        assert AuthorStats.for_author(user).note_count == count
+
+
+@multi_db
+def test_user_delete_cascades_to_author_shard(shards, moved_author):
+    create_notes(moved_author, count=2)
+    shard = hash_shard(moved_author.pk)
+    moved_author.delete()
+    assert not Note.objects.using(shard).exists()
+    assert not AuthorStats.objects.using(shard).exists()
+
+
+@multi_db
+def test_slug_check_excludes_note_only_in_its_shard(shards, moved_author):
+    note = Note.objects.create(
+        title='Заметка', text='Текст', slug='shared-slug', author=moved_author
+    )
+    other = next(alias for alias in SHARDS if alias != note._state.db)
+    Note.objects.using(other).create(
+        pk=note.pk, title='Чужая', text='Текст', slug='shared-slug',
+        author_id=moved_author.pk,
+    )
+    assert Note.objects.slug_exists('shared-slug', exclude=note)
+    form = NoteForm(
+        instance=note,
+        data={'title': note.title, 'text': note.text, 'slug': note.slug},
+    )
+    assert not form.is_valid()
+
+
+@multi_db
+def test_rebalance_after_growing_shard_count(settings, moved_author, capsys):
+    create_notes(moved_author, count=3)
+    settings.NOTES_SHARDS = SHARDS
+    destination = hash_shard(moved_author.pk)
+    call_command(
+        'rebalance_notes', author=[moved_author.pk], grace=0, batch_size=2
+    )
+    assert 'Перенесено авторов: 1' in capsys.readouterr().out
+    assert not Note.objects.using('default').exists()
+    assert Note.objects.using(destination).count() == 3
+    assert Note.objects.for_author(moved_author).count() == 3
+    assert AuthorStats.for_author(moved_author).note_count == 3
+    placement = AuthorShard.objects.get(author=moved_author)
+    assert (placement.alias, placement.frozen) == (destination, False)
+
+
+@multi_db
+def test_pinned_authors_stay_readable_until_rebalance(settings, moved_author):
+    create_notes(moved_author, count=2)
+    call_command('rebalance_notes', pin=True)
+    settings.NOTES_SHARDS = SHARDS
+    assert shard_for_author(moved_author.pk) == 'default'
+    assert Note.objects.for_author(moved_author).count() == 2
+
+
+@multi_db
+def test_move_author_rejects_writes_until_done(shards, moved_author,
+                                               monkeypatch):
+    AuthorShard.objects.create(author=moved_author, alias='default')
+    note, = create_notes(moved_author)
+    destination = next(alias for alias in SHARDS if alias != 'default')
+    rebalance = load_command_class('notes', 'rebalance_notes')
+    copy_notes = rebalance.copy_notes
+    rejected = []
+
+    def copy_while_editing(*args):
+        for write in (note.save, note.delete):
+            with pytest.raises(AuthorMoving):
+                write()
+            rejected.append(write)
+        return copy_notes(*args)
+
+    monkeypatch.setattr(rebalance, 'copy_notes', copy_while_editing)
+    call_command(rebalance, author=[moved_author.pk], to=destination, grace=0)
+    assert len(rejected) == 2
+    moved = Note.objects.for_author(moved_author).get()
+    assert (moved.slug, moved._state.db) == (note.slug, destination)
+    moved.title = 'После переноса'
+    moved.save()
+
+
+@multi_db
+def test_rebalance_keeps_shared_page(settings, author,
+                                     django_capture_on_commit_callbacks):
+    note = Note.objects.create(title='Заметка', text='Текст', author=author)
+    with django_capture_on_commit_callbacks(execute=True):
+        note.share()
+        settings.NOTES_SHARDS = SHARDS
+        call_command(
+            'rebalance_notes', author=[author.pk], to='notes_shard_1',
+            grace=0,
+        )
+    assert get_page(note.share_key) is not None
+
+
+@multi_db
+def test_rebalance_waits_once_per_freeze_batch(settings, monkeypatch):
+    users = create_users(*(f'Автор {index}' for index in range(6)))
+    for user in users[:4]:
+        create_notes(user, slug=f'note-{user.pk}')
+    settings.NOTES_SHARDS = SHARDS
+    sleeps = []
+    monkeypatch.setattr(
+        rebalance_notes.time, 'sleep', lambda seconds: sleeps.append(seconds)
+    )
+    call_command(
+        'rebalance_notes', author=[user.pk for user in users], grace=2,
+        freeze_batch=10,
+    )
+    assert sleeps == [2]
+    for user in users:
+        assert shard_for_author(user.pk) == hash_shard(user.pk)
+    assert not AuthorShard.objects.filter(frozen=True).exists()
+
+
+@multi_db
+def test_write_while_moving_returns_503(shards, author_client, author, note):
+    AuthorShard.objects.create(
+        author=author, alias=note._state.db, frozen=True
+    )
+    for name in ('notes:edit', 'notes:delete'):
+        response = author_client.post(
+            reverse(name, args=(note.slug,)),
+            {'title': 'Новый', 'text': 'Текст', 'slug': note.slug},
+        )
+        assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+        assert response['Retry-After'] == '5'
+    assert Note.objects.for_author(author).get().title == note.title
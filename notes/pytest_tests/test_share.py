@@ -0,0 +1,141 @@
+from http import HTTPStatus
+
+import brotli
+import pytest
+from pytest_django.asserts import assertRedirects
+
+from django.core.cache import caches
+from django.urls import reverse
+
+from notes.share import CACHE_KEY, SHARE_CACHE, get_page, render_page
+
+
+@pytest.fixture
+def shared_note(note, django_capture_on_commit_callbacks):
+    # Страница попадает в кэш только после коммита.
+    with django_capture_on_commit_callbacks(execute=True):
+        note.share()
+    return note
+
+
+def test_author_can_share_note(author_client, note):
+    url = reverse('notes:share', args=(note.slug,))
+    response = author_client.post(url)
+    assertRedirects(response, reverse('notes:share', args=(note.slug,)))
+    note.refresh_from_db()
+    assert note.get_share_url() is not None
+
+
+def test_other_user_cant_share_note(admin_client, note):
+    url = reverse('notes:share', args=(note.slug,))
+    response = admin_client.post(url)
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    note.refresh_from_db()
+    assert note.get_share_url() is None
+
+
+def test_shared_note_served_without_database(
+        client, shared_note, django_assert_num_queries
+):
+    note = shared_note
+    with django_assert_num_queries(0):
+        response = client.get(note.get_share_url())
+    assert response.status_code == HTTPStatus.OK
+    assert note.text in response.content.decode()
+    assert 'public' in response['Cache-Control']
+    assert 'sessionid' not in response.cookies
+
+
+def test_shared_note_not_modified(client, note):
+    note.share()
+    url = note.get_share_url()
+    etag = client.get(url)['ETag']
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_shared_page_refreshed_on_save(client, note):
+    note.share()
+    note.text = 'Обновлённый текст'
+    note.save()
+    response = client.get(note.get_share_url())
+    assert 'Обновлённый текст' in response.content.decode()
+
+
+def test_revoked_link_not_found(client, note):
+    note.share()
+    url = note.get_share_url()
+    note.unshare()
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_shared_page_cache_is_shared_between_processes(
+        shared_note, django_capture_on_commit_callbacks
+):
+    # Отдельный экземпляр бэкенда — как кэш другого воркера.
+    other_worker = caches.create_connection(SHARE_CACHE)
+    share_key = shared_note.share_key
+    assert other_worker.get(CACHE_KEY.format(share_key))['body']
+    with django_capture_on_commit_callbacks(execute=True):
+        shared_note.unshare()
+    assert get_page(share_key) is None
+    assert other_worker.default_timeout is not None
+
+
+def test_revoked_page_not_restored_by_concurrent_read(
+        shared_note, django_capture_on_commit_callbacks
+):
+    share_key = shared_note.share_key
+    cache = caches[SHARE_CACHE]
+    stale_page = render_page(shared_note)
+    assert get_page(share_key) is not None
+    cache.delete(CACHE_KEY.format(share_key))
+    with django_capture_on_commit_callbacks(execute=True):
+        shared_note.unshare()
+        # Читатель, прочитавший ссылку из базы до коммита отзыва.
+        cache.add(CACHE_KEY.format(share_key), stale_page)
+    assert get_page(share_key) is None
+
+
+def test_shared_page_published_after_commit(
+        shared_note, django_capture_on_commit_callbacks
+):
+    share_key = shared_note.share_key
+    with django_capture_on_commit_callbacks(execute=True):
+        shared_note.text = 'Ещё не зафиксированный текст'
+        shared_note.save()
+        assert 'Ещё не' not in get_page(share_key)['body'].decode()
+    assert 'Ещё не' in get_page(share_key)['body'].decode()
+
+
+def test_unknown_link_cached_as_missing(db, django_assert_num_queries):
+    assert get_page('unknown') is None
+    with django_assert_num_queries(0):
+        assert get_page('unknown') is None
+
+
+def test_forged_link_not_found(client, note):
+    note.share()
+    url = reverse('notes:shared', args=(note.share_key + ':forged',))
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_share_page_available_to_author(author_client, note):
+    response = author_client.get(reverse('notes:share', args=(note.slug,)))
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_shared_page_served_compressed(client, note):
+    note.share()
+    response = client.get(note.get_share_url(), HTTP_ACCEPT_ENCODING='gzip')
+    assert response['Content-Encoding'] == 'gzip'
+    assert response['ETag'].startswith('W/')
+
+
+def test_shared_page_served_with_brotli(client, note):
+    note.share()
+    response = client.get(note.get_share_url(), HTTP_ACCEPT_ENCODING='br')
+    assert response['Content-Encoding'] == 'br'
+    assert note.text in brotli.decompress(response.content).decode()
@@ -0,0 +1,48 @@
+import pytest
+from pytils.translit import slugify as pytils_slugify
+
+from notes.models import Note
+from notes.slugs import slugify, slugify_many
+
+TITLES = (
+    'Заголовок',
+    'Новый заголовок',
+    'Щука и Ёжик — «друзья» №1…',
+    'Tom & Jerry &amp; co',
+    '  пробелы\tи\nпереводы   строк ',
+    'дефисы -- и – тире',
+    'Ъ Ь ъ ь “кавычки” ‘ещё’',
+    'émoji 🙂 и İ Σ ß',
+    'нулевой\x00 символ',
+    '',
+)
+
+
+@pytest.mark.parametrize('title', TITLES)
+def test_slugify_matches_pytils(title):
+    assert slugify(title) == pytils_slugify(title)
+
+
+def test_slugify_many_matches_pytils():
+    titles = [title for title in TITLES if '\x00' not in title]
+    assert slugify_many(titles) == [pytils_slugify(t) for t in titles]
+
+
+def test_slugify_many_with_separator_in_title():
+    assert slugify_many(TITLES) == [pytils_slugify(t) for t in TITLES]
+
+
+def test_slugify_is_cached():
+    slugify.cache_clear()
+    slugify('Заголовок')
+    slugify('Заголовок')
+    assert slugify.cache_info().hits == 1
+
+
+def test_bulk_create_fills_slugs(author):
+    Note.objects.bulk_create(
+        Note(title=title, text='Текст', author=author)
+        for title in ('Первая заметка', 'Вторая заметка')
+    )
+    slugs = set(Note.objects.values_list('slug', flat=True))
+    assert slugs == {'pervaya-zametka', 'vtoraya-zametka'}
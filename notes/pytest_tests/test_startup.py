@@ -0,0 +1,23 @@
+import pytest
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from notes.management.commands.profile_startup import cold_start
+
+
+def test_pytils_not_imported_on_cold_start():
+    run, timings = cold_start('yanote.wsgi')
+    assert 'notes.models' in run['registry']
+    assert 'pytils' not in timings
+
+
+def test_profile_startup_reports_modules(capsys):
+    call_command('profile_startup', repeat=1, top=5, max_ms=0)
+    output = capsys.readouterr().out
+    assert 'холодный старт yanote.wsgi' in output
+
+
+def test_profile_startup_fails_over_budget():
+    with pytest.raises(CommandError, match='превышает порог'):
+        call_command('profile_startup', repeat=1, max_ms=0.001)
@@ -0,0 +1,98 @@
+from django.core.management import call_command
+from django.urls import reverse
+
+from notes.models import AuthorStats, Note
+
+
+def get_stats(author):
+    stats = AuthorStats.for_author(author)
+    return stats.note_count, stats.text_length
+
+
+def test_stats_follow_note_changes(author, note):
+    assert get_stats(author) == (1, len(note.text))
+    note.text = 'Совсем другой текст'
+    note.save()
+    assert get_stats(author) == (1, len(note.text))
+    Note.objects.create(
+        title='Вторая', text='Ещё', slug='second', author=author
+    )
+    assert get_stats(author) == (2, len(note.text) + len('Ещё'))
+    note.delete()
+    assert get_stats(author) == (1, len('Ещё'))
+
+
+def test_stats_follow_update_fields_by_attname(author, admin_user, note):
+    note.author_id = admin_user.pk
+    note.save(update_fields=('author_id',))
+    assert get_stats(author) == (0, 0)
+    assert get_stats(admin_user) == (1, len(note.text))
+
+
+def test_stats_follow_refresh_from_db(author, note):
+    other = Note.objects.get(pk=note.pk)
+    other.text = 'x' * 500
+    other.save()
+    note.refresh_from_db()
+    note.text = 'y'
+    note.save()
+    assert get_stats(author) == (1, 1)
+
+
+def test_stats_follow_partial_refresh_from_db(author, note):
+    other = Note.objects.get(pk=note.pk)
+    other.text = 'x' * 500
+    other.save()
+    note.refresh_from_db(fields=('title',))
+    note.text = 'y'
+    note.save()
+    assert get_stats(author) == (1, 1)
+
+
+def test_stats_updated_in_note_transaction(
+        author, note, django_assert_num_queries
+):
+    note.text = 'Новый текст'
+    # SAVEPOINT, UPDATE заметки, UPDATE счётчиков, RELEASE.
+    with django_assert_num_queries(4):
+        note.save()
+
+
+def test_stats_after_edit_through_form(author_client, author, note, form_data):
+    author_client.post(reverse('notes:edit', args=(note.slug,)), form_data)
+    assert get_stats(author) == (1, len(form_data['text']))
+
+
+def test_bulk_create_updates_stats(author):
+    Note.objects.bulk_create(
+        Note(title=f'Заметка {i}', text='Текст', author=author)
+        for i in range(3)
+    )
+    assert get_stats(author) == (3, 3 * len('Текст'))
+
+
+def test_dashboard_reads_stats(author_client, note, django_assert_num_queries):
+    url = reverse('notes:stats')
+    # Сессия, пользователь и одна выборка статистики по первичному ключу.
+    with django_assert_num_queries(3):
+        response = author_client.get(url)
+    assert response.context['stats'].note_count == 1
+
+
+def test_reconcile_fixes_drift(author, note, capsys):
+    AuthorStats.objects.filter(author=author).update(
+        note_count=10, text_length=0
+    )
+    call_command('reconcile_stats')
+    assert 'Исправлено строк: 1' in capsys.readouterr().out
+    assert get_stats(author) == (1, len(note.text))
+
+
+def test_reassign_recomputes_stats(admin_client, admin_user, author, note):
+    admin_client.post(reverse('admin:notes_note_changelist'), {
+        'action': 'reassign_author',
+        '_selected_action': [note.pk],
+        'author': admin_user.pk,
+    })
+    assert get_stats(author) == (0, 0)
+    assert get_stats(admin_user) == (1, len(note.text))
@@ -0,0 +1,40 @@
+"""Маршрутизация запросов к шардам заметок."""
+from django.db import DEFAULT_DB_ALIAS
+
+from .sharding import get_shards, shard_for_author
+
+SHARDED_LABELS = {'notes.note', 'notes.authorstats'}
+
+
+class NoteShardRouter:
+    """Заметки и статистика живут в шарде автора, остальное — в основной."""
+
+    def db_for_read(self, model, **hints):
+        if model._meta.label_lower not in SHARDED_LABELS:
+            return DEFAULT_DB_ALIAS
+        return self._note_db(hints)
+
+    def db_for_write(self, model, **hints):
+        if model._meta.label_lower not in SHARDED_LABELS:
+            return DEFAULT_DB_ALIAS
+        return self._note_db(hints, for_write=True)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        labels = {obj1._meta.label_lower, obj2._meta.label_lower}
+        if SHARDED_LABELS & labels:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == DEFAULT_DB_ALIAS or db not in get_shards():
+            return None
+        # В дополнительных шардах есть только заметки и статистика.
+        return f'{app_label}.{model_name}' in SHARDED_LABELS
+
+    @staticmethod
+    def _note_db(hints, for_write=False):
+        instance = hints.get('instance')
+        author_id = getattr(instance, 'author_id', None)
+        if author_id is None:
+            return None
+        return shard_for_author(author_id, for_write=for_write)
@@ -0,0 +1,48 @@
+"""Распределение заметок авторов по нескольким базам SQLite."""
+import zlib
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError
+
+
+class AuthorMoving(OperationalError):
+    """Запись отклонена: заметки автора сейчас переносятся между шардами."""
+
+
+def get_shards():
+    """Список псевдонимов баз данных, в которых хранятся заметки."""
+    return list(getattr(settings, 'NOTES_SHARDS', [DEFAULT_DB_ALIAS]))
+
+
+def hash_shard(author_id):
+    """Шард по стабильному хэшу id автора (не зависит от PYTHONHASHSEED)."""
+    shards = get_shards()
+    index = zlib.crc32(str(author_id).encode()) % len(shards)
+    return shards[index]
+
+
+def shard_for_author(author_id, for_write=False):
+    """Шард автора: явное назначение из каталога или хэш от id.
+
+    При единственном шарде обращения к каталогу не происходит.
+    Пока заметки автора переносятся, запись в них запрещена:
+    с for_write=True поднимается AuthorMoving.
+    """
+    shards = get_shards()
+    if len(shards) == 1:
+        return shards[0]
+    from .models import AuthorShard
+
+    placement = AuthorShard.objects.filter(
+        author_id=author_id
+    ).values_list('alias', 'frozen').first()
+    if placement is None:
+        return hash_shard(author_id)
+    alias, frozen = placement
+    if frozen and for_write:
+        raise AuthorMoving(
+            f'Заметки автора {author_id} переносятся в другой шард.'
+        )
+    if alias in shards:
+        return alias
+    return hash_shard(author_id)
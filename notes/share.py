@@ -0,0 +1,119 @@
+"""Публичные ссылки на заметки, отдаваемые из заранее собранного кэша."""
+import hashlib
+
+from django.core import signing
+from django.core.cache import caches
+from django.db import transaction
+from django.http import Http404, HttpResponse, HttpResponseNotModified
+from django.template.loader import render_to_string
+
+from .compression import ENCODINGS, choose_encoding, compress
+from .sharding import get_shards
+
+SHARE_PREFIX = 'shared/'
+SHARE_SALT = 'notes.share'
+# Общий для всех процессов кэш, см. CACHES в настройках.
+SHARE_CACHE = 'shared_notes'
+CACHE_KEY = 'notes:shared:{}'
+# Метка отозванной или неизвестной ссылки: пока она в кэше,
+# повторные запросы по такой ссылке не обходят шарды.
+MISSING = 'missing'
+MISSING_TIMEOUT = 60
+CACHE_CONTROL = 'public, max-age=300'
+
+
+def make_token(share_key):
+    """Подписывает ключ публикации заметки."""
+    return signing.Signer(salt=SHARE_SALT).sign(share_key)
+
+
+def key_from_token(token):
+    """Возвращает ключ публикации или None для поддельной ссылки."""
+    try:
+        return signing.Signer(salt=SHARE_SALT).unsign(token)
+    except signing.BadSignature:
+        return None
+
+
+def render_page(note):
+    """Собирает готовую страницу заметки, её сжатые версии и ETag."""
+    body = render_to_string('notes/shared.html', {'note': note}).encode()
+    page = {'body': body, 'etag': f'"{hashlib.md5(body).hexdigest()}"'}
+    for encoding in ENCODINGS:
+        page[encoding] = compress(body, encoding)
+    return page
+
+
+def cache_page(note):
+    """Пересобирает страницу заметки после фиксации транзакции.
+
+    Страница собирается сразу, а в кэш попадает только после коммита:
+    иначе читатели увидели бы ещё не зафиксированный текст. Живёт
+    TIMEOUT из CACHES, изменение заметки пересобирает её раньше.
+    """
+    key = CACHE_KEY.format(note.share_key)
+    page = render_page(note)
+    transaction.on_commit(
+        lambda: caches[SHARE_CACHE].set(key, page), using=note._state.db
+    )
+
+
+def drop_page(share_key, using):
+    """После коммита заменяет страницу меткой MISSING.
+
+    Метка, а не удаление, нужна из-за гонки: читатель, успевший
+    прочитать ссылку из базы до коммита, не сможет вернуть страницу
+    в кэш — get_page кладёт её только через add.
+    """
+    key = CACHE_KEY.format(share_key)
+    transaction.on_commit(
+        lambda: caches[SHARE_CACHE].set(key, MISSING, MISSING_TIMEOUT),
+        using=using,
+    )
+
+
+def get_page(share_key):
+    """Страница из кэша; при промахе кэш заполняется из базы.
+
+    Промах по неизвестной ссылке тоже кэшируется на MISSING_TIMEOUT.
+    """
+    from .models import Note
+
+    cache = caches[SHARE_CACHE]
+    key = CACHE_KEY.format(share_key)
+    page = cache.get(key)
+    if page == MISSING:
+        return None
+    if page is not None:
+        return page
+    for alias in get_shards():
+        note = Note.objects.using(alias).filter(share_key=share_key).first()
+        if note is not None:
+            page = render_page(note)
+            cache.add(key, page)
+            return page
+    cache.add(key, MISSING, MISSING_TIMEOUT)
+    return None
+
+
+def shared_response(request, token):
+    """Ответ на запрос публичной ссылки без сессии и аутентификации."""
+    share_key = key_from_token(token)
+    page = get_page(share_key) if share_key else None
+    if page is None:
+        raise Http404('Ссылка недействительна.')
+    encoding = choose_encoding(request)
+    etag = page['etag']
+    if encoding in page:
+        etag = 'W/' + etag
+    if request.headers.get('If-None-Match') in (etag, page['etag']):
+        response = HttpResponseNotModified()
+    elif encoding in page:
+        response = HttpResponse(page[encoding])
+        response['Content-Encoding'] = encoding
+    else:
+        response = HttpResponse(page['body'])
+    response['ETag'] = etag
+    response['Cache-Control'] = CACHE_CONTROL
+    response['Vary'] = 'Accept-Encoding'
+    return response
@@ -0,0 +1,75 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+
+from .events import broker, is_muted, note_event
+from .models import AuthorStats, Note
+from .share import cache_page, drop_page
+from .sharding import get_shards
+from .stats import ensure_snapshot, record_delete, record_save
+
+
+@receiver(pre_delete, sender=settings.AUTH_USER_MODEL)
+def delete_sharded_notes(sender, instance, using, **kwargs):
+    """Каскадно удаляет заметки и статистику автора из других шардов.
+
+    Каскад ORM срабатывает только в базе, где удаляется пользователь.
+    """
+    for alias in get_shards():
+        if alias != using:
+            Note.objects.using(alias).filter(author_id=instance.pk).delete()
+            AuthorStats.objects.using(alias).filter(
+                author_id=instance.pk
+            ).delete()
+
+
+@receiver(pre_save, sender=Note)
+def remember_stats_snapshot(sender, instance, using, **kwargs):
+    ensure_snapshot(instance, using)
+
+
+@receiver(post_save, sender=Note)
+def update_stats_on_save(sender, instance, created, update_fields, using,
+                         **kwargs):
+    record_save(instance, created, update_fields, using)
+
+
+@receiver(post_delete, sender=Note)
+def update_stats_on_delete(sender, instance, using, **kwargs):
+    record_delete(instance, using)
+
+
+@receiver(post_save, sender=Note)
+def refresh_shared_page(sender, instance, **kwargs):
+    """Пересобирает публичную страницу заметки после коммита."""
+    if instance.share_key:
+        cache_page(instance)
+
+
+@receiver(post_delete, sender=Note)
+def drop_shared_page(sender, instance, using, **kwargs):
+    # При переносе между шардами страница не меняется.
+    if instance.share_key and not is_muted():
+        drop_page(instance.share_key, using)
+
+
+def publish_after_commit(action, note, using):
+    if is_muted():
+        return
+    event = note_event(action, note)
+    transaction.on_commit(
+        lambda: broker.publish(note.author_id, event), using=using
+    )
+
+
+@receiver(post_save, sender=Note)
+def publish_note_saved(sender, instance, created, using, **kwargs):
+    publish_after_commit('created' if created else 'updated', instance, using)
+
+
+@receiver(post_delete, sender=Note)
+def publish_note_deleted(sender, instance, using, **kwargs):
+    publish_after_commit('deleted', instance, using)
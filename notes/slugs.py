@@ -0,0 +1,60 @@
+"""Быстрое формирование slug, совпадающее с pytils.translit.slugify."""
+import re
+from functools import lru_cache
+
+SLUG_CACHE_SIZE = 4096
+# Разделитель заголовков в пакетном режиме: его нет в алфавите pytils.
+SEPARATOR = '\x00'
+
+AMPERSAND = re.compile(r'&amp;|&')
+DASHES = re.compile(r'[-\s]+')
+NOT_SLUG = re.compile(r'[^\w\s-]')
+
+
+class TranslationTable(dict):
+    """Таблица для str.translate: символы вне алфавита удаляются."""
+
+    def __missing__(self, key):
+        return None
+
+
+@lru_cache(maxsize=None)
+def get_table():
+    """Собирает таблицу транслитерации из таблицы pytils один раз.
+
+    pytils импортируется только здесь, при первом формировании slug.
+    """
+    from pytils.translit import ALPHABET, TRANSTABLE
+
+    table = TranslationTable()
+    for symbol in ALPHABET:
+        if len(symbol) == 1:
+            table[ord(symbol)] = symbol
+    # Первое правило для символа побеждает, как в последовательных replace.
+    for source, target in reversed(TRANSTABLE):
+        table[ord(source)] = target
+    for code, target in table.items():
+        table[code] = NOT_SLUG.sub('', target)
+    table[ord(SEPARATOR)] = SEPARATOR
+    return table
+
+
+def _prepare(text):
+    text = AMPERSAND.sub(' and ', text.lower())
+    return DASHES.sub('-', text)
+
+
+@lru_cache(maxsize=SLUG_CACHE_SIZE)
+def slugify(title):
+    """Slug для заголовка; повторные заголовки берутся из кэша."""
+    slug = _prepare(str(title)).translate(get_table())
+    return slug.replace(SEPARATOR, '').strip()
+
+
+def slugify_many(titles):
+    """Slug для списка заголовков за один проход регулярок и translate."""
+    titles = [str(title) for title in titles]
+    if any(SEPARATOR in title for title in titles):
+        return [slugify(title) for title in titles]
+    joined = _prepare(SEPARATOR.join(titles)).translate(get_table())
+    return [slug.strip() for slug in joined.split(SEPARATOR)]
@@ -0,0 +1,78 @@
+"""ASGI-приложение, транслирующее события заметок через Server-Sent Events."""
+import asyncio
+from importlib import import_module
+from types import SimpleNamespace
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.http.cookie import parse_cookie
+
+from .events import broker, format_sse
+
+EVENTS_PATH = '/events/'
+HEARTBEAT = 15
+PING = b': ping\n\n'
+
+
+@sync_to_async
+def get_author_id(scope):
+    """Возвращает id пользователя из сессионной cookie или None."""
+    cookies = {}
+    for name, value in scope.get('headers', ()):
+        if name == b'cookie':
+            cookies = parse_cookie(value.decode('latin-1'))
+    session_key = cookies.get(settings.SESSION_COOKIE_NAME)
+    if session_key is None:
+        return None
+    engine = import_module(settings.SESSION_ENGINE)
+    request = SimpleNamespace(session=engine.SessionStore(session_key))
+    return get_user(request).pk
+
+
+async def wait_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def note_events(scope, receive, send):
+    """Держит соединение открытым и отправляет события текущего автора."""
+    author_id = await get_author_id(scope)
+    if author_id is None:
+        await send({'type': 'http.response.start', 'status': 403})
+        await send({'type': 'http.response.body', 'body': b''})
+        return
+    queue = broker.subscribe(author_id)
+    disconnect = asyncio.ensure_future(wait_disconnect(receive))
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream; charset=utf-8'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+            ],
+        })
+        while not disconnect.done():
+            event = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait(
+                {event, disconnect},
+                timeout=HEARTBEAT,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if event in done:
+                body = format_sse(event.result())
+            else:
+                event.cancel()
+                if disconnect.done():
+                    break
+                body = PING
+            await send({
+                'type': 'http.response.body',
+                'body': body,
+                'more_body': True,
+            })
+    finally:
+        disconnect.cancel()
+        broker.unsubscribe(author_id, queue)
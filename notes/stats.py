@@ -0,0 +1,143 @@
+"""Инкрементальные счётчики статистики авторов."""
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Coalesce, Length
+from django.utils import timezone
+
+# Поля заметки, от которых зависят счётчики.
+STATS_FIELDS = {'text', 'author'}
+
+
+def snapshot(note):
+    """Запоминает автора и длину текста в том виде, в каком они в базе."""
+    note._stats_snapshot = (note.author_id, len(note.text))
+
+
+def ensure_snapshot(note, using):
+    """Дочитывает старые значения, если заметка загружена не из from_db."""
+    from .models import Note
+
+    if note._state.adding or hasattr(note, '_stats_snapshot'):
+        return
+    row = Note.objects.using(using).filter(pk=note.pk).values_list(
+        'author_id', Length('text')
+    ).first()
+    note._stats_snapshot = row or (note.author_id, 0)
+
+
+def count_notes(author_ids, using):
+    """Фактические счётчики по таблице заметок: id -> (число, длина)."""
+    from .models import Note
+
+    rows = Note.objects.using(using).filter(
+        author_id__in=author_ids
+    ).values('author_id').annotate(
+        note_count=Count('pk'),
+        text_length=Coalesce(Sum(Length('text')), 0),
+    ).order_by()
+    return {
+        row['author_id']: (row['note_count'], row['text_length'])
+        for row in rows
+    }
+
+
+def apply_delta(author_id, notes, chars, using):
+    """Сдвигает счётчики автора одним UPDATE в текущей транзакции.
+
+    Если строки статистики ещё нет, она создаётся по фактическим данным,
+    но не при удалении: автор, возможно, удаляется целиком.
+    """
+    from .models import AuthorStats
+
+    now = timezone.now()
+    updated = AuthorStats.objects.using(using).filter(
+        author_id=author_id
+    ).update(
+        note_count=F('note_count') + notes,
+        text_length=F('text_length') + chars,
+        last_activity=now,
+    )
+    if updated or notes < 0:
+        return
+    note_count, text_length = count_notes([author_id], using).get(
+        author_id, (0, 0)
+    )
+    AuthorStats.objects.using(using).create(
+        author_id=author_id,
+        note_count=note_count,
+        text_length=text_length,
+        last_activity=now,
+    )
+
+
+def field_names(model, update_fields):
+    """Имена полей из update_fields, где поля могут быть заданы attname."""
+    return {model._meta.get_field(name).name for name in update_fields}
+
+
+def record_save(note, created, update_fields, using):
+    if created:
+        apply_delta(note.author_id, 1, len(note.text), using)
+    elif update_fields is None or STATS_FIELDS & field_names(
+        note, update_fields
+    ):
+        old_author_id, old_length = note._stats_snapshot
+        if old_author_id == note.author_id:
+            apply_delta(
+                note.author_id, 0, len(note.text) - old_length, using
+            )
+        else:
+            apply_delta(old_author_id, -1, -old_length, using)
+            apply_delta(note.author_id, 1, len(note.text), using)
+    else:
+        apply_delta(note.author_id, 0, 0, using)
+    snapshot(note)
+
+
+def record_delete(note, using):
+    _, length = getattr(note, '_stats_snapshot', (None, len(note.text)))
+    apply_delta(note.author_id, -1, -length, using)
+
+
+def record_bulk_create(notes, using):
+    deltas = {}
+    for note in notes:
+        count, length = deltas.get(note.author_id, (0, 0))
+        deltas[note.author_id] = (count + 1, length + len(note.text))
+        snapshot(note)
+    for author_id, (count, length) in deltas.items():
+        apply_delta(author_id, count, length, using)
+
+
+def reconcile(author_ids, using):
+    """Пересчитывает счётчики авторов и исправляет расхождения.
+
+    Возвращает число исправленных строк.
+    """
+    from .models import AuthorStats
+
+    actual = count_notes(author_ids, using)
+    stored = AuthorStats.objects.using(using).in_bulk(author_ids)
+    to_create, to_update = [], []
+    for author_id in author_ids:
+        note_count, text_length = actual.get(author_id, (0, 0))
+        stats = stored.get(author_id)
+        if stats is None:
+            if note_count:
+                to_create.append(AuthorStats(
+                    author_id=author_id,
+                    note_count=note_count,
+                    text_length=text_length,
+                ))
+        elif (stats.note_count, stats.text_length) != (
+            note_count, text_length
+        ):
+            stats.note_count = note_count
+            stats.text_length = text_length
+            to_update.append(stats)
+    with transaction.atomic(using=using):
+        AuthorStats.objects.using(using).bulk_create(to_create)
+        AuthorStats.objects.using(using).bulk_update(
+            to_update, ('note_count', 'text_length')
+        )
+    return len(to_create) + len(to_update)
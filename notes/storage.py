@@ -0,0 +1,37 @@
+import gzip
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import StaticFilesStorage
+
+from .compression import brotli
+
+PRECOMPRESSED_EXTENSIONS = (
+    '.css', '.js', '.svg', '.html', '.txt', '.json', '.xml', '.map',
+)
+
+
+class CompressedStaticFilesStorage(StaticFilesStorage):
+    """При collectstatic кладёт рядом со статикой копии .gz и .br.
+
+    Веб-сервер отдаёт их напрямую (gzip_static в nginx), поэтому
+    статика не сжимается на каждый запрос.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            return
+        for name in paths:
+            if not name.endswith(PRECOMPRESSED_EXTENSIONS):
+                continue
+            path = Path(self.path(name))
+            content = path.read_bytes()
+            if len(content) < settings.RESPONSE_COMPRESSION_MIN_SIZE:
+                continue
+            variants = [('.gz', gzip.compress(content, 9, mtime=0))]
+            if brotli is not None:
+                variants.append(('.br', brotli.compress(content, quality=11)))
+            for suffix, compressed in variants:
+                if len(compressed) < len(content):
+                    Path(f'{path}{suffix}').write_bytes(compressed)
+                    yield name, name + suffix, True
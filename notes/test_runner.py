@@ -0,0 +1,14 @@
+from django.test.runner import DiscoverRunner, default_test_processes
+
+
+class ParallelDiscoverRunner(DiscoverRunner):
+    """Запускает unittest-тесты на всех ядрах по умолчанию.
+
+    Каждый процесс получает свою копию тестовой базы SQLite:
+    файловая база копируется, база в памяти наследуется через fork.
+    """
+
+    @classmethod
+    def add_arguments(cls, parser):
+        super().add_arguments(parser)
+        parser.set_defaults(parallel=default_test_processes())
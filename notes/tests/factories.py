@@ -0,0 +1,39 @@
+"""Пакетное создание тестовых данных для обоих наборов тестов."""
+from django.contrib.auth import get_user_model
+
+from notes.models import Note
+from notes.sharding import shard_for_author
+
+User = get_user_model()
+
+
+def create_users(*usernames):
+    """Создаёт пользователей одним INSERT и возвращает их в том же порядке.
+
+    На SQLite bulk_create не возвращает pk, поэтому объекты
+    перечитываются одним запросом.
+    """
+    User.objects.bulk_create(User(username=name) for name in usernames)
+    users = User.objects.in_bulk(usernames, field_name='username')
+    return [users[name] for name in usernames]
+
+
+def create_notes(author, count=1, title='Заголовок', text='Текст заметки',
+                 slug='note-slug'):
+    """Создаёт заметки автора одним INSERT в его шарде.
+
+    Одна заметка получает переданные title и slug, несколько —
+    нумерованные варианты.
+    """
+    if count == 1:
+        fields = [(title, slug)]
+    else:
+        fields = [(f'{title} {i}', f'{slug}-{i}') for i in range(count)]
+    Note.objects.using(shard_for_author(author.pk)).bulk_create(
+        Note(title=note_title, text=text, slug=note_slug, author=author)
+        for note_title, note_slug in fields
+    )
+    notes = Note.objects.for_author(author).in_bulk(
+        [note_slug for _, note_slug in fields], field_name='slug'
+    )
+    return [notes[note_slug] for _, note_slug in fields]
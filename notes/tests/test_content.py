@@ -1,31 +1,30 @@
-from django.contrib.auth import get_user_model
 from django.test import Client, TestCase
 from django.urls import reverse
 
-from notes.models import Note
+from notes.sharding import get_shards
+from notes.tests.factories import create_notes, create_users
 from notes.forms import NoteForm
 
 
-User = get_user_model()
-
-
 class TestContent(TestCase):
     """Класс для тестирования контента страниц."""
 
+    # Заметки лежат в шардах, поэтому тестам доступны все их базы.
+    databases = set(get_shards())
+
     @classmethod
     def setUpTestData(cls):
         """Подготовка данных перед тестами."""
-        cls.reader = User.objects.create(username='Reader')
+        cls.reader, cls.author = create_users('Reader', 'Author')
         cls.reader_client = Client()
         cls.reader_client.force_login(cls.reader)
-        cls.author = User.objects.create(username='Author')
         cls.author_client = Client()
         cls.author_client.force_login(cls.author)
-        cls.note = Note.objects.create(
+        cls.note, = create_notes(
+            cls.author,
             title='Заголовок',
             text='Текст заметки',
             slug='note-slug',
-            author=cls.author,
         )
 
     def test_notes_list_for_different_users(self):
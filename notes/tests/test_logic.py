@@ -1,17 +1,15 @@
 from http import HTTPStatus
 
-from django.contrib.auth import get_user_model
 from django.test import Client, TestCase
 from django.urls import reverse
 from pytils.translit import slugify
 
 from notes.models import Note
+from notes.sharding import get_shards
+from notes.tests.factories import create_notes, create_users
 from notes.forms import WARNING
 
 
-User = get_user_model()
-
-
 NOTE_TITLE = 'Заголовок'
 NOTE_TEXT = 'Текст заметки'
 NOTE_SLUG = 'note-slug'
@@ -20,20 +18,22 @@ NOTE_SLUG = 'note-slug'
 class TestNotes(TestCase):
     """Класс тестов логики работы с заметками."""
 
+    # Заметки лежат в шардах, поэтому тестам доступны все их базы.
+    databases = set(get_shards())
+
     @classmethod
     def setUpTestData(cls):
         """Подготовка данных перед всеми тестами."""
-        cls.reader = User.objects.create(username='Reader')
+        cls.reader, cls.author = create_users('Reader', 'Author')
         cls.reader_client = Client()
         cls.reader_client.force_login(cls.reader)
-        cls.author = User.objects.create(username='Author')
         cls.author_client = Client()
         cls.author_client.force_login(cls.author)
-        cls.note = Note.objects.create(
+        cls.note, = create_notes(
+            cls.author,
             title=NOTE_TITLE,
             text=NOTE_TEXT,
             slug=NOTE_SLUG,
-            author=cls.author,
         )
         cls.note_slug = (cls.note.slug,)
         cls.FORM_DATA = {
@@ -1,19 +1,19 @@
 from http import HTTPStatus
 
-from django.contrib.auth import get_user_model
 from django.test import Client, TestCase
 from django.urls import reverse
 from pytest_django.asserts import assertRedirects
 
-from notes.models import Note
-
-
-User = get_user_model()
+from notes.sharding import get_shards
+from notes.tests.factories import create_notes, create_users
 
 
 class TestRoutes(TestCase):
     """Класс для тестирования маршрутов."""
 
+    # Заметки лежат в шардах, поэтому тестам доступны все их базы.
+    databases = set(get_shards())
+
     def get_response_object(self, client_type, url_namespace, args=None):
         """Универсальный метод получения объекта response."""
         url = reverse(url_namespace, args=args)
@@ -23,17 +23,16 @@ class TestRoutes(TestCase):
     @classmethod
     def setUpTestData(cls):
         """Подготовка данных перед тестами."""
-        cls.reader = User.objects.create(username='Reader')
+        cls.reader, cls.author = create_users('Reader', 'Author')
         cls.reader_client = Client()
         cls.reader_client.force_login(cls.reader)
-        cls.author = User.objects.create(username='Author')
         cls.author_client = Client()
         cls.author_client.force_login(cls.author)
-        cls.note = Note.objects.create(
+        cls.note, = create_notes(
+            cls.author,
             title='Заголовок',
             text='Текст заметки',
             slug='note-slug',
-            author=cls.author,
         )
         cls.note_slug = (cls.note.slug,)
 
@@ -1,6 +1,7 @@
 from django.urls import path
 
 from notes import views
+from notes.share import SHARE_PREFIX
 
 app_name = 'notes'
 
@@ -12,4 +13,12 @@ urlpatterns = [
     path('delete/<slug:slug>/', views.NoteDelete.as_view(), name='delete'),
     path('notes/', views.NotesList.as_view(), name='list'),
     path('done/', views.NoteSuccess.as_view(), name='success'),
+    path('stats/', views.NoteStats.as_view(), name='stats'),
+    path('share/<slug:slug>/', views.NoteShare.as_view(), name='share'),
+    path('unshare/<slug:slug>/', views.NoteUnshare.as_view(), name='unshare'),
+    path(
+        SHARE_PREFIX + '<str:token>/',
+        views.NoteShared.as_view(),
+        name='shared',
+    ),
 ]
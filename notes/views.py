@@ -1,9 +1,15 @@
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.shortcuts import redirect, render
 from django.urls import reverse_lazy
 from django.views import generic
 
 from .forms import NoteForm
-from .models import Note
+from .models import AuthorStats, Note
+from .share import shared_response
+from .sharding import AuthorMoving
+
+# Через сколько секунд повторить запись, отклонённую на время переноса.
+MOVING_RETRY_AFTER = 5
 
 
 class Home(generic.TemplateView):
@@ -23,7 +29,19 @@ class NoteBase(LoginRequiredMixin):
 
     def get_queryset(self):
         """Пользователь может работать только со своими заметками."""
-        return self.model.objects.filter(author=self.request.user)
+        return self.model.objects.for_author(self.request.user)
+
+    def dispatch(self, request, *args, **kwargs):
+        """Пока заметки автора переносятся, запись отвечает 503.
+
+        Retry-After подсказывает клиенту, когда повторить запрос.
+        """
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except AuthorMoving:
+            response = render(request, 'notes/moving.html', status=503)
+            response['Retry-After'] = MOVING_RETRY_AFTER
+            return response
 
 
 class NoteCreate(NoteBase, generic.CreateView):
@@ -57,3 +75,43 @@ class NotesList(NoteBase, generic.ListView):
 class NoteDetail(NoteBase, generic.DetailView):
     """Заметка подробно."""
     template_name = 'notes/detail.html'
+
+
+class NoteStats(LoginRequiredMixin, generic.TemplateView):
+    """Статистика заметок пользователя."""
+    template_name = 'notes/stats.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['stats'] = AuthorStats.for_author(self.request.user)
+        return context
+
+
+class NoteShare(NoteBase, generic.DetailView):
+    """Открытие публичного доступа к заметке."""
+    template_name = 'notes/share.html'
+
+    def post(self, request, *args, **kwargs):
+        note = self.get_object()
+        note.share()
+        return redirect('notes:share', slug=note.slug)
+
+
+class NoteUnshare(NoteShare):
+    """Отзыв публичной ссылки на заметку."""
+
+    def post(self, request, *args, **kwargs):
+        note = self.get_object()
+        note.unshare()
+        return redirect('notes:share', slug=note.slug)
+
+
+class NoteShared(generic.View):
+    """Публичная страница заметки.
+
+    Обычно запрос перехватывает SharedNoteMiddleware, минуя сессии
+    и аутентификацию; представление нужно для reverse() и как запасной путь.
+    """
+
+    def get(self, request, token):
+        return shared_response(request, token)
@@ -2,6 +2,8 @@
 ASGI config for yanote project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Requests to ``notes.sse.EVENTS_PATH`` are served by the async Server-Sent
+Events app, everything else goes to Django.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
@@ -13,4 +15,12 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from notes.sse import EVENTS_PATH, note_events  # noqa: E402
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'http' and scope['path'] == EVENTS_PATH:
+        return await note_events(scope, receive, send)
+    return await django_application(scope, receive, send)
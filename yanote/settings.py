@@ -23,6 +23,11 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # ETag считается по уже сжатому телу, а ответ 304 получает
+    # Cache-Control, Vary и ETag того же ответа 200.
+    'django.middleware.http.ConditionalGetMiddleware',
+    'notes.middleware.ResponsePolicyMiddleware',
+    'notes.middleware.SharedNoteMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -52,13 +57,69 @@ TEMPLATES = [
 WSGI_APPLICATION = 'yanote.wsgi.application'
 
 
+# Соединения живут между запросами, чтобы не открывать файл и не
+# применять SQLITE_PRAGMAS на каждый запрос.
+CONN_MAX_AGE = 60
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': CONN_MAX_AGE,
+    }
+}
+
+# Заметки распределяются по шардам по хэшу id автора.
+# Дополнительные шарды: db_notes_shard_1.sqlite3, db_notes_shard_2.sqlite3...
+NOTES_SHARD_COUNT = 1
+
+for index in range(1, NOTES_SHARD_COUNT):
+    DATABASES[f'notes_shard_{index}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / f'db_notes_shard_{index}.sqlite3',
+        'CONN_MAX_AGE': CONN_MAX_AGE,
     }
+
+NOTES_SHARDS = list(DATABASES)
+
+# PRAGMA для каждого нового соединения SQLite (notes.db.configure_sqlite).
+# WAL позволяет читать во время записи, busy_timeout — ждать блокировку.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'busy_timeout': 5000,
 }
 
+# Повторы записи при «database is locked»: число попыток и задержки, с.
+SQLITE_LOCK_RETRIES = 5
+SQLITE_LOCK_RETRY_DELAY = 0.05
+SQLITE_LOCK_RETRY_MAX_DELAY = 1
+
+DATABASE_ROUTERS = ['notes.routers.NoteShardRouter']
+
+# Публичные страницы заметок (notes.share) лежат в файловом кэше, общем
+# для всех процессов сервера: у LocMemCache кэш свой в каждом воркере,
+# и отзыв ссылки не дошёл бы до остальных. При нескольких серверах
+# сюда подставляется Memcached. TIMEOUT ограничивает жизнь страницы,
+# даже если инвалидация где-то потерялась.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared_notes': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'shared_notes',
+        'TIMEOUT': 60 * 60,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+# manage.py test по умолчанию запускает тесты параллельно, --parallel 1
+# возвращает последовательный запуск.
+TEST_RUNNER = 'notes.test_runner.ParallelDiscoverRunner'
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -83,7 +144,42 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# collectstatic кладёт рядом со статикой .gz и, если установлен brotli, .br.
+STATICFILES_STORAGE = 'notes.storage.CompressedStaticFilesStorage'
+
+# Ответы меньше этого размера, байт, не сжимаются.
+RESPONSE_COMPRESSION_MIN_SIZE = 512
+
+# Правила Cache-Control и Vary по имени маршрута. Страницы содержат имя
+# пользователя в шапке, поэтому кэшируются только в браузере с проверкой
+# по ETag; формы с CSRF-токеном не кэшируются вовсе.
+PRIVATE_REVALIDATE = {
+    'cache_control': {'private': True, 'no_cache': True},
+    'vary': ('Cookie',),
+}
+NO_STORE = {'cache_control': {'private': True, 'no_store': True}}
+
+RESPONSE_CACHE_POLICY = {
+    'notes:home': PRIVATE_REVALIDATE,
+    'notes:list': PRIVATE_REVALIDATE,
+    'notes:detail': PRIVATE_REVALIDATE,
+    'notes:stats': PRIVATE_REVALIDATE,
+    'notes:success': PRIVATE_REVALIDATE,
+    'notes:add': NO_STORE,
+    'notes:edit': NO_STORE,
+    'notes:delete': NO_STORE,
+    'notes:share': NO_STORE,
+    'users:login': NO_STORE,
+    'users:logout': NO_STORE,
+    'users:signup': NO_STORE,
+}
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('notes:home')
+
+# Порог регрессии холодного старта для manage.py profile_startup, мс.
+STARTUP_BUDGET_MS = 1500